@@ -19,6 +19,7 @@ setup(
     license='MIT',
     license_files = ('LICENSE'),
     packages=['syntok'],
+    package_data={'syntok': ['lexicons/*.txt']},
     install_requires=['regex'],  # handles all Unicode categories in Regular Expressions
     long_description=long_description,
     classifiers=[
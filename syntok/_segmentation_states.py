@@ -1,10 +1,116 @@
-from abc import ABCMeta, abstractmethod
-from typing import List, Iterator, Optional, Tuple
+from collections import Counter, deque
+from time import perf_counter
+from typing import Any, Callable, Deque, Dict, FrozenSet, List, Iterable, Iterator, NamedTuple, Optional, Tuple, Union, cast
 
 from syntok.tokenizer import Token
 
 
-class State(metaclass=ABCMeta):
+class SpanHistory:
+    """
+    A stand-in for the history list of Tokens that only keeps
+    the first and the last four Tokens of the production.
+
+    Therefore, its length is never more than four, which suffices for the
+    length checks of the States, and only the last Token is accessible.
+    """
+
+    __slots__ = ("first", "append", "_tail")
+
+    def __init__(self) -> None:
+        self.first: Optional[Token] = None
+        self._tail: Deque[Token] = deque(maxlen=4)
+        # after the first Token, the Tokens are appended directly to the tail
+        self.append: Callable[[Token], None] = self._append_first
+
+    def __len__(self) -> int:
+        return len(self._tail)
+
+    def __getitem__(self, index: int) -> Token:
+        if index != -1 and index != len(self._tail) - 1:
+            raise IndexError("only the last Token in a SpanHistory is accessible")
+
+        return self._tail[-1]
+
+    def _append_first(self, token: Token) -> None:
+        self.first = token
+        self._tail.append(token)
+        self.append = self._tail.append
+
+    def extend(self, tokens: Iterable[Token]) -> None:
+        for token in tokens:
+            self.append(token)
+
+    @property
+    def last(self) -> Optional[Token]:
+        return self._tail[-1] if self._tail else None
+
+
+History = Union[List[Token], SpanHistory]
+
+
+class Suspended(Exception):
+    """Raised by a `TokenStream` that has run out of Tokens, but is not closed yet."""
+
+
+class TokenStream(Iterator[Token]):
+    """
+    A stream of Tokens that can be extended, to segment text arriving in chunks.
+
+    When it runs out of Tokens before it is closed, it raises `Suspended`,
+    and a `State` reading from it can be resumed once it has been extended.
+    """
+
+    __slots__ = ("tokens", "position", "closed")
+
+    def __init__(self) -> None:
+        self.tokens: List[Token] = []
+        """The Tokens of the stream (from the last extension on)."""
+        self.position = 0
+        """The index of the next Token in `tokens`."""
+        self.closed = False
+        """If the stream has ended."""
+
+    def __next__(self) -> Token:
+        if self.position < len(self.tokens):
+            self.position += 1
+            return self.tokens[self.position - 1]
+        elif self.closed:
+            raise StopIteration
+        else:
+            raise Suspended
+
+    @property
+    def pending(self) -> bool:
+        """If the next Token can be read (without suspending)."""
+        return self.position < len(self.tokens) or self.closed
+
+    def extend(self, tokens: Iterable[Token]) -> None:
+        """Add more Tokens to the stream, dropping the Tokens read so far."""
+        del self.tokens[:self.position]
+        self.position = 0
+        self.tokens.extend(tokens)
+
+    def close(self) -> None:
+        """End the stream."""
+        self.closed = True
+
+
+FIRST_TOKEN, INNER_TOKEN, TERMINAL, END = range(4)
+"""The states of the segmentation state machine."""
+
+
+class State:
+    """
+    The segmentation state of a Token stream:
+    the stream, the queue of Tokens read ahead, and the history
+    of Tokens in the current production (i.e., sentence).
+
+    Iterating over a State runs the segmentation state machine,
+    where the states are encoded as `FIRST_TOKEN`, `INNER_TOKEN`,
+    `TERMINAL`, and `END`, and each transition is a method returning
+    the next state, so no objects are created for state transitions.
+    """
+
     opening_brackets = frozenset(
         "([{\uFF5F\uFF5B\uFF3B\uFF08\uFE5D\uFE5B\uFE59\uFD3E\u301A\u3018\u2985\u2983\u2329"
     )
@@ -100,54 +206,155 @@ class State(metaclass=ABCMeta):
     )
     """Uppercase words that indicate a sentence start."""
 
+    rules = (
+        "lowercase_or_inner_punctuation", "sentence_starter", "abbreviation", "number_abbreviation",
+        "attached_number", "attached_token", "large_number", "day_before_month", "month_before_day",
+        "inner_dot", "enumeration", "single_consonant", "bracket_before_inner_punctuation",
+        "bracket_title", "bracket_before_lowercase", "bracket", "terminal",
+    )
+    """The names of the rules deciding whether to split at a terminal or bracket, in order of precedence."""
+
+    splitting_rules = frozenset(("sentence_starter", "bracket_title", "bracket", "terminal"))
+    """The rules that split the sentences."""
+
     def __init__(
-        self, stream: Iterator[Token], queue: List[Token], history: List[Token]
+        self, stream: Iterator[Token], history: Optional[History] = None, config: Optional["SegmenterConfig"] = None
     ) -> None:
+        if config is None:  # use the (possibly altered) class attributes
+            config = SegmenterConfig.from_state()
+
+        self.__max_bracket_skipping_length = config.max_bracket_skipping_length
+        self.__abbreviations = config.abbreviations
+        self.__months = config.months
+        self.__starters = config.starters
+        self.__roman_numerals = config.roman_numerals
+        first_token = next(stream, None)
         self.__stream = stream
-        self.__queue = queue
-        self.__history = history
+        self.__queue = deque() if first_token is None else deque([first_token])  # type: Deque[Token]
+        self.__history = [] if history is None else history  # type: History
+        self.__state = END if first_token is None else FIRST_TOKEN  # where to resume the machine (see `resume`)
+        # only the first and last Tokens of a SpanHistory are needed, so the inner words can be skipped
+        self.__skip_words: Optional[Callable[[], None]] = (
+            getattr(stream, "skip_words", None) if isinstance(self.__history, SpanHistory) else None
+        )
 
-    def collect_history(self) -> Optional[List[Token]]:
-        """
-        Collect the current production so far.
+    def __iter__(self) -> Iterator[History]:
+        """Run the state machine, generating the productions (i.e., sentences)."""
+        state = END if self.is_empty else FIRST_TOKEN
+        inner_token = self._inner_token if self.__skip_words is None else self._inner_words
+
+        while state != END:
+            if state == INNER_TOKEN:
+                state = inner_token()
+            elif state == FIRST_TOKEN:
+                state = self._first_token()
+            else:  # TERMINAL
+                if self.__history:
+                    yield self.__collect()
+
+                state = FIRST_TOKEN if not self.is_empty or self._fetch_next() else END
 
-        If called from a Terminal state, the production will be the sentence.
-        """
         if self.__history:
-            sentence = self.__history
-            self.__history = []
-            return sentence
+            yield self.__collect()
+
+    def resume(self) -> List[History]:
+        """
+        Run the state machine on a `TokenStream` until it suspends or ends,
+        returning the productions completed by then.
+
+        If the stream is suspended during a transition, the transition is undone
+        and redone when the machine is resumed (after the stream has been extended),
+        so all decisions are taken with the same Tokens as when reading the stream at once
+        (undoing a transition requires a list history, though, and an `InstrumentedState`
+        also counts the bracket searches of the transitions it undid).
+        """
+        stream = cast(TokenStream, self.__stream)
+        queue, history = self.__queue, cast(List[Token], self.__history)
+        productions = []
+        state = self.__state
+
+        try:
+            while state != END:
+                queued, length, position = list(queue), len(history), stream.position
+
+                if state == INNER_TOKEN:
+                    state = self._inner_token()
+                elif state == FIRST_TOKEN:
+                    state = self._first_token()
+                else:  # TERMINAL
+                    if history:
+                        productions.append(self.__collect())
+                        history = cast(List[Token], self.__history)
+
+                    state = FIRST_TOKEN if not self.is_empty or self._fetch_next() else END
+        except Suspended:
+            queue.clear()
+            queue.extend(queued)
+            del history[length:]
+            stream.position = position
+
+        self.__state = state
+
+        if state == END and self.__history:
+            productions.append(self.__collect())
+
+        return productions
+
+    def __collect(self) -> History:
+        sentence = self.__history
+        self.__history = type(sentence)()
+        return sentence
+
+    def _first_token(self) -> int:
+        """Transition from the first token of a production."""
+        if not self.is_empty or self._fetch_next():
+            # If a sentence is opened by parenthesis, treat the whole as its own sentence.
+            if self.next_is_an_opening_bracket and self._skip_bracketed_text() and len(self.__history) > 3 and not self.next_is_lowercase:
+                return TERMINAL
+
+        if not self.is_empty or self._fetch_next():
+            self._move()  # Do not skip parenthesis if they open the sentence.
+
+            if self.next_is_a_terminal:
+                return TERMINAL if self._terminal_rule(FIRST_TOKEN) in State.splitting_rules else FIRST_TOKEN
+            else:
+                return INNER_TOKEN
         else:
-            return None
+            return END
 
-    def __iter__(self) -> Iterator["State"]:
-        """Move to the next state."""
-        state = self  # type: Optional['State']
+    def _inner_token(self) -> int:
+        """Transition from an inner token of a production."""
+        # this is the hot path, so the next_is_* properties are inlined here
+        queue = self.__queue
 
-        while state is not None:
-            yield state
-            state = next(state, None)
+        if queue or self._fetch_next():
+            self._move_and_skip_bracketed_text()
 
-    @abstractmethod
-    def __next__(self) -> "State":
-        """State transitions to be implemented by the concrete classes."""
-        raise StopIteration
+            if queue:
+                value = queue[0].value
 
-    @property
-    def _stream(self) -> Iterator[Token]:
-        return self.__stream
+                if value in State.terminals or value in State.opening_brackets:
+                    return TERMINAL if self._terminal_rule(INNER_TOKEN) in State.splitting_rules else INNER_TOKEN
 
-    @property
-    def _queue(self) -> List[Token]:
-        return self.__queue
+            return INNER_TOKEN
+        else:
+            return END
 
-    @property
-    def _history(self) -> List[Token]:
-        return self.__history
+    def _inner_words(self) -> int:
+        """
+        Transition from an inner token of a production, after letting the stream skip
+        the words following it (as only the last one can affect the next transition).
 
-    @property
-    def at_sentence(self) -> bool:
-        return False
+        A stream can skip words if it has a `skip_words()` method that skips all but the last
+        of the Tokens following the last Token read from it that are neither terminals nor
+        opening brackets; this is only done for productions collected in a `SpanHistory`.
+        """
+        queue, skip_words = self.__queue, self.__skip_words
+
+        if len(queue) == 1 and skip_words is not None:  # otherwise, the Tokens read ahead must be processed first
+            skip_words()
+
+        return self._inner_token()
 
     @property
     def next_is_a_terminal(self) -> bool:
@@ -214,16 +421,21 @@ class State(metaclass=ABCMeta):
 
     @property
     def next_is_month_abbreviation(self) -> bool:
-        return not self.is_empty and self.__queue[0].value in State.months
+        return not self.is_empty and self.__queue[0].value in self.__months
 
     @property
     def next_is_sentence_starter(self) -> bool:
-        return not self.is_empty and self.__queue[0].value in State.starters
+        return not self.is_empty and self.__queue[0].value in self.__starters
 
     @property
     def is_empty(self) -> bool:
         return len(self.__queue) == 0
 
+    @property
+    def look_ahead(self) -> int:
+        """The number of Tokens read ahead (i.e., in the queue)."""
+        return len(self.__queue)
+
     @property
     def last(self) -> str:
         """The last token processed and added to histroy, if any."""
@@ -246,7 +458,7 @@ class State(metaclass=ABCMeta):
         Find the next token after a bracketed text that does not look like a sentence,
         when next is an opening bracket.
         """
-        closing_bracket, has_inner_sentence = self.__find_end_of_bracketed_text()
+        closing_bracket, has_inner_sentence = self._find_end_of_bracketed_text()
 
         if (
             closing_bracket > 0
@@ -275,7 +487,7 @@ class State(metaclass=ABCMeta):
         when next is an opening bracket.
         """
         assert self.next_is_an_opening_bracket
-        closing_bracket, has_inner_sentence = self.__find_end_of_bracketed_text()
+        closing_bracket, has_inner_sentence = self._find_end_of_bracketed_text()
         start = self.__queue[0].offset
 
         if closing_bracket > 0:
@@ -283,43 +495,47 @@ class State(metaclass=ABCMeta):
             end = t.offset + len(t.value)
 
             if (
-                end - start < State.max_bracket_skipping_length
+                end - start < self.__max_bracket_skipping_length
                 or not has_inner_sentence
             ):
-                self.__history.extend(self.__queue[: closing_bracket + 1])
-                self.__queue = self.__queue[closing_bracket + 1:]
+                history, queue = self.__history, self.__queue
+
+                for _ in range(closing_bracket + 1):
+                    history.append(queue.popleft())
+
                 self._fetch_next()
                 return True
 
         return False
 
-    def __find_end_of_bracketed_text(self) -> Tuple[int, bool]:
+    def _find_end_of_bracketed_text(self) -> Tuple[int, bool]:
         """
         Find the index of the closing bracket in the queue (or zero if none)
         and return a flag if the bracket seems to contain a sentence,
         when next is an opening bracket.
         """
-        bracket_stack = [self.__queue[0].value]
+        queue = self.__queue  # the deque is only ever modified in place
+        bracket_stack = [queue[0].value]
         queue_idx = 1
         first_is_title = None
         last_is_terminal = False
 
-        while (len(self.__queue) > queue_idx or self._fetch_next()) and queue_idx < 50:
+        while (len(queue) > queue_idx or self._fetch_next()) and queue_idx < 50:
+            value = queue[queue_idx].value
+
             # check if there is something like an inner sentence inside
-            if first_is_title is None and self.__queue[queue_idx].value.isalnum():
-                first_is_title = self.__queue[queue_idx].value.istitle()
-            elif first_is_title and self.__queue[queue_idx].value.isalnum():
-                if len(self.__queue) > queue_idx + 1 or self._fetch_next():
-                    last_is_terminal = (
-                        self.__queue[queue_idx + 1].value in State.terminals
-                    )
+            if first_is_title is None and value.isalnum():
+                first_is_title = value.istitle()
+            elif first_is_title and value.isalnum():
+                if len(queue) > queue_idx + 1 or self._fetch_next():
+                    last_is_terminal = queue[queue_idx + 1].value in State.terminals
                 else:
                     last_is_terminal = False
 
             # stack brackets until the stack is empty
-            if self.__queue[queue_idx].value in State.opening_brackets:
-                bracket_stack.append(self.__queue[0].value)
-            elif self.__queue[queue_idx].value in State.closing_brackets:
+            if value in State.opening_brackets:
+                bracket_stack.append(queue[0].value)
+            elif value in State.closing_brackets:
                 bracket_stack.pop()
 
                 if len(bracket_stack) == 0:
@@ -334,7 +550,7 @@ class State(metaclass=ABCMeta):
 
     def _move(self) -> bool:
         """Advance the queue, storing the old value in history."""
-        self.__history.append(self.__queue.pop(0))
+        self.__history.append(self.__queue.popleft())
 
         if not self.__queue:
             return self._fetch_next()
@@ -343,7 +559,7 @@ class State(metaclass=ABCMeta):
 
     def _move_and_skip_bracketed_text(self) -> bool:
         """Advance the queue, and also skip over bracketed text if applicable."""
-        if self._move() and self.next_is_an_opening_bracket:
+        if self._move() and self.__queue[0].value in State.opening_brackets:
             self._skip_bracketed_text()
 
         if not self.__queue:
@@ -351,10 +567,11 @@ class State(metaclass=ABCMeta):
         else:
             return True
 
-    def _move_and_maybe_extract_terminal(self) -> "State":
+    def _terminal_rule(self, state: int) -> str:
         """
-        If next is a terminal or an opening bracket, advance the queue and
-        check whether to transition to the Terminal state.
+        If next is a terminal or an opening bracket, advance the queue and return the name of
+        the rule (see `rules`) that decides whether to transition from the current `state`
+        to the TERMINAL state (if it is one of the `splitting_rules`).
         """
         # token before the terminal ...
         token_before = self.last
@@ -371,71 +588,70 @@ class State(metaclass=ABCMeta):
 
         # Now decide whether to split:
         if self.next_is_lowercase or self.next_is_inner_sentence_punctuation:
-            return self  # return self ==> don't split
+            return "lowercase_or_inner_punctuation"  # don't split
 
         elif (
             not (
-                isinstance(self, FirstToken)
-                and self.is_single_letter_or_roman_numeral(token_before)
+                state == FIRST_TOKEN
+                and self.__is_single_letter_or_roman_numeral(token_before)
             )
             and self.next_is_sentence_starter
         ):  # not a single roman or letter char sentences, and a clear sentence starter
-            return Terminal(self._stream, self._queue, self._history)
-            # return Terminal ==> split
+            return "sentence_starter"  # split
 
-        elif token_before in State.abbreviations and token_after not in (
+        elif token_before in self.__abbreviations and token_after not in (
             self.closing_brackets or self.closing_quotes
         ):
-            return self
+            return "abbreviation"
 
         elif token_before in ("no", "No", "NO") and self.next_is_alphanumeric_containing_numeric_char:
-            return self
+            return "number_abbreviation"
 
         elif self.next_is_numeric and self.next_has_no_spacing:
-            return self
+            return "attached_number"
 
         elif self.next_has_no_spacing and (
                 not token_after.istitle()
                 or not token_after.isalpha()
                 or len(token_after) == 1
         ):
-            return self
+            return "attached_token"
 
         elif self.next_is_a_large_number:
-            return self
+            return "large_number"
 
         elif token_before.isnumeric() and self.next_is_month_abbreviation:
-            return self
+            return "day_before_month"
 
-        elif token_before in State.months and self.next_is_numeric:
-            return self
+        elif token_before in self.__months and self.next_is_numeric:
+            return "month_before_day"
 
         elif "." in token_before and token_after != ".":
-            return self
+            return "inner_dot"
 
         elif (
-            isinstance(self, FirstToken) or token_before.isupper()
-        ) and self.is_single_letter_or_roman_numeral(token_before):
-            return self
+            state == FIRST_TOKEN or token_before.isupper()
+        ) and self.__is_single_letter_or_roman_numeral(token_before):
+            return "enumeration"
 
         elif self.is_single_consonant(token_before):
-            return self
+            return "single_consonant"
 
         elif token_after in State.opening_brackets:
             token_after_brackets = self.__find_next_token_after_bracket()
             token_after_opening_bracket = self.__find_token_after_next()
 
             if token_after_brackets in State.inner_sentence_punctuation:
-                return self
+                return "bracket_before_inner_punctuation"
             elif token_after_opening_bracket.istitle():
-                return Terminal(self._stream, self._queue, self._history)
+                return "bracket_title"
             if token_after_brackets[:1].islower():
-                return self
+                return "bracket_before_lowercase"
             else:
-                return Terminal(self._stream, self._queue, self._history)
+                return "bracket"
 
         else:  # do segment the sentences at this position
-            return Terminal(self._stream, self._queue, self._history)
+            return "terminal"
 
     def __move_to_next_relevant_word_and_return_token_after_terminal(self) -> str:
         """
@@ -480,71 +696,107 @@ class State(metaclass=ABCMeta):
     def is_single_letter_or_roman_numeral(token):
         return len(token) == 1 or token in State.roman_numerals
 
+    def __is_single_letter_or_roman_numeral(self, token):
+        return len(token) == 1 or token in self.__roman_numerals
+
     @staticmethod
     def is_single_consonant(token_before):
         return len(token_before) == 1 and token_before.isalpha() and token_before not in State.vowels
 
 
-class FirstToken(State):
-    def __next__(self) -> State:
-        if not self.is_empty or self._fetch_next():
-            # If a sentence is opened by parenthesis, treat the whole as its own sentence.
-            if self.next_is_an_opening_bracket and self._skip_bracketed_text() and len(self._history) > 3 and not self.next_is_lowercase:
-                return Terminal(self._stream, self._queue, self._history)
+class SegmenterConfig(NamedTuple):
+    """
+    The (immutable) configuration of the segmentation state machine.
 
-        if not self.is_empty or self._fetch_next():
-            self._move()  # Do not skip parenthesis if they open the sentence.
+    By default, the configuration is taken from the `State` class attributes;
+    to configure the words for other languages or domains, see `syntok.lexicon`.
+    """
 
-            if self.next_is_a_terminal:
-                return self._move_and_maybe_extract_terminal()
-            else:
-                return InnerToken(self._stream, self._queue, self._history)
-        else:
-            return End(self._stream, self._queue, self._history)
+    max_bracket_skipping_length: int = State.max_bracket_skipping_length
+    """Max. num. characters of bracketed text in sentences to ignore when segmenting."""
 
+    abbreviations: FrozenSet[str] = State.abbreviations
+    """Abbreviations with no dots inside."""
 
-class InnerToken(State):
-    def __next__(self) -> State:
-        if not self.is_empty or self._fetch_next():
-            self._move_and_skip_bracketed_text()
+    months: FrozenSet[str] = State.months
+    """Month abbreviations."""
 
-            if self.next_is_a_terminal or self.next_is_an_opening_bracket:
-                return self._move_and_maybe_extract_terminal()
-            else:
-                return self
-        else:
-            return End(self._stream, self._queue, self._history)
+    starters: FrozenSet[str] = State.starters
+    """Uppercase words that indicate a sentence start."""
 
+    roman_numerals: FrozenSet[str] = State.roman_numerals
+    """Roman numerals (used as enumerations)."""
 
-class Terminal(State):
-    @property
-    def at_sentence(self) -> bool:
-        return len(self._history) > 0
+    @classmethod
+    def from_state(cls, max_bracket_skipping_length: Optional[int] = None) -> "SegmenterConfig":
+        """
+        The configuration of the current (possibly altered) `State` class attributes.
 
-    def __next__(self) -> State:
-        if not self.is_empty or self._fetch_next():
-            return FirstToken(self._stream, self._queue, self._history)
-        else:
-            return End(self._stream, self._queue, self._history)
+        :param max_bracket_skipping_length: to use instead of the `State`'s
+        :return: the configuration
+        """
+        if max_bracket_skipping_length is None:
+            max_bracket_skipping_length = State.max_bracket_skipping_length
 
+        return cls(max_bracket_skipping_length, State.abbreviations, State.months, State.starters, State.roman_numerals)
 
-class End(State):
-    @property
-    def at_sentence(self) -> bool:
-        return len(self._history) > 0
 
-    def __next__(self) -> State:
-        raise StopIteration
+class Instrumentation:
+    """
+    Statistics of the decisions taken by the segmentation state machine:
+    how often each rule decided whether to split at a terminal or bracket,
+    how many Tokens were read ahead for these decisions and the bracket searches,
+    and the time spent searching for the ends of bracketed texts.
 
+    Only `InstrumentedState`s collect them; the plain `State` has no overhead.
+    """
 
-class Begin(State):
-    def __init__(self, stream: Iterator[Token]) -> None:
-        first_token = next(stream, None)
-        queue = [] if first_token is None else [first_token]
-        super().__init__(stream, queue, [])
+    __slots__ = ("rules", "look_ahead", "bracket_look_ahead", "bracket_searches", "bracket_seconds")
+
+    def __init__(self) -> None:
+        self.rules: Counter = Counter()
+        """Number of decisions per rule name (see `State.rules`)."""
+        self.look_ahead: Counter = Counter()
+        """Histogram of the number of Tokens read ahead when a rule decided."""
+        self.bracket_look_ahead: Counter = Counter()
+        """Histogram of the number of Tokens read ahead after searching for the end of a bracketed text."""
+        self.bracket_searches = 0
+        """Number of searches for the end of a bracketed text."""
+        self.bracket_seconds = 0.0
+        """Time spent searching for the ends of bracketed texts."""
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Export the statistics as a (JSON-serializable) dictionary."""
+        return {
+            "rules": {rule: self.rules[rule] for rule in State.rules},
+            "splits": sum(self.rules[rule] for rule in State.splitting_rules),
+            "look_ahead": dict(sorted(self.look_ahead.items())),
+            "bracket_look_ahead": dict(sorted(self.bracket_look_ahead.items())),
+            "bracket_searches": self.bracket_searches,
+            "bracket_seconds": self.bracket_seconds,
+        }
+
+
+class InstrumentedState(State):
+    """A segmentation `State` that records its decisions in an `Instrumentation`."""
 
-    def __next__(self) -> State:
-        if self.is_empty:
-            return End(self._stream, self._queue, self._history)
-        else:
-            return FirstToken(self._stream, self._queue, self._history)
+    def __init__(
+        self, stream: Iterator[Token], history: Optional[History], config: Optional[SegmenterConfig],
+        instrumentation: Instrumentation
+    ) -> None:
+        super().__init__(stream, history, config)
+        self.instrumentation = instrumentation
+
+    def _terminal_rule(self, state: int) -> str:
+        rule = super()._terminal_rule(state)
+        self.instrumentation.rules[rule] += 1
+        self.instrumentation.look_ahead[self.look_ahead] += 1
+        return rule
+
+    def _find_end_of_bracketed_text(self) -> Tuple[int, bool]:
+        start = perf_counter()
+        result = super()._find_end_of_bracketed_text()
+        self.instrumentation.bracket_seconds += perf_counter() - start
+        self.instrumentation.bracket_searches += 1
+        self.instrumentation.bracket_look_ahead[self.look_ahead] += 1
+        return result
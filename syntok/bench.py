@@ -0,0 +1,430 @@
+"""
+Benchmark the throughput, latency, and memory use of the tokenizer and the segmenter.
+
+The corpora are generated from a fixed random seed, so the results of two runs
+(e.g., before and after a change) can be compared. Run it as a module to get
+the results as JSON, and compare them to a baseline to gate regressions::
+
+    python3 -m syntok.bench > baseline.json
+    python3 -m syntok.bench --baseline baseline.json --tolerance 0.2
+
+Any other text files given as arguments are benchmarked as additional corpora,
+and ``--import-time`` adds the cold start time (of importing syntok and segmenting
+a first text in a fresh interpreter), as paid by short-lived worker processes.
+"""
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from syntok import segmenter
+from syntok.tokenizer import Token, Tokenizer
+
+Corpus = List[str]
+"""A list of documents."""
+
+Function = Callable[[Any], Tuple[int, int]]
+"""A benchmarked function, returning the number of tokens and sentences in a document (or its Tokens)."""
+
+_WORDS = {
+    "en": """
+    the of and to a in is was that for it with as his on be at by had are but from or have an they which
+    one you were all we her she there would their will when who him been has more if no out do so can what
+    time people year way day man thing woman life child world school state family student group country
+    problem hand part place case week company system program question work government number night point
+    home water room mother area money story fact month lot right study book eye job word business issue
+    """.split(),
+    "de": """
+    der die und in den von zu das mit sich des auf für ist im dem nicht ein eine als auch es an werden aus
+    er hat dass sie nach wird bei einer um am sind noch wie einem über einen so zum war haben nur oder aber
+    vor zur bis mehr durch man sein wurde sei Jahr Zeit Mensch Kind Frau Mann Tag Hand Welt Stadt Land
+    Haus Leben Arbeit Geld Weg Frage Schule Familie Woche Monat Abend Morgen Straße Größe Bürger Gemeinde
+    """.split(),
+    "es": """
+    de la que el en y a los se del las un por con no una su para es al lo como más pero sus le ya o este
+    fue ha sí porque esta son entre cuando muy sin sobre también me hasta hay donde quien desde todo nos
+    año tiempo día vida mundo casa país ciudad hombre mujer niño gobierno trabajo parte forma historia
+    momento lugar agua noche semana mes familia escuela pregunta dinero camino región situación razón
+    """.split(),
+}
+
+_STARTERS = {
+    "en": "The This However But And In It We They He She There".split(),
+    "de": "Der Die Das Aber Und Auch Er Sie Es Wir Ich Dann".split(),
+    "es": "El La Los Las Pero Y En Por Es No Para También".split(),
+}
+
+_CITATIONS = [
+    "(Smith et al. 2001)", "(Jones & Lee, 1999; Müller 2004)", "[12]", "[3, 7-9]", "(p < .001)",
+    "(n = 32)", "(Fig. 3)", "(see Tab. 2)", "(e.g., in vitro)", "(i.e., 3.5 mg/kg)", "(cf. Ref. 4)",
+    "(95% CI 1.2-3.4)", "(Phil. 4:8)", "(approx. 10 nm)",
+]
+
+_LEGAL = [
+    "Art. 5 Abs. 2", "No. 12", "Sec. 4", "U.S.C. § 1983", "v.", "Inc.", "Corp.", "Ltd.", "Co.", "i.e.",
+    "e.g.", "cf.", "etc.", "vs.", "Nr. 3", "lit. b", "ff.", "Dr.", "Mr.", "Prof.", "St.", "Jan. 22",
+    "U.S.", "E.U.", "Vol. 2", "approx.", "incl.", "resp.",
+]
+
+
+def prose(rnd: random.Random, language: str, sentences: int, paragraph: int = 6) -> str:
+    """Generate a document of `sentences` sentences in the `language`, with `paragraph` sentences per paragraph."""
+    words, starters = _WORDS[language], _STARTERS[language]
+    paragraphs = []
+
+    for start in range(0, sentences, paragraph):
+        text = []
+
+        for _ in range(min(paragraph, sentences - start)):
+            sentence = [rnd.choice(starters)] + rnd.sample(words, rnd.randint(6, 24))
+
+            if rnd.random() < 0.3:
+                sentence[rnd.randrange(1, len(sentence))] += ","
+
+            text.append(" ".join(sentence) + rnd.choice([".", ".", ".", "?", "!"]))
+
+        paragraphs.append(_wrap(" ".join(text)))
+
+    return "\n\n".join(paragraphs)
+
+
+def scientific(rnd: random.Random, sentences: int) -> str:
+    """Generate a citation-heavy scientific document, exercising the bracket skipping."""
+    return _insert(rnd, prose(rnd, "en", sentences), _CITATIONS, 0.15)
+
+
+def legal(rnd: random.Random, sentences: int) -> str:
+    """Generate an abbreviation-dense legal document."""
+    return _insert(rnd, prose(rnd, "en", sentences), _LEGAL, 0.2)
+
+
+def long_paragraph(rnd: random.Random, sentences: int) -> str:
+    """Generate a document that is a single, very long paragraph."""
+    return prose(rnd, "en", sentences, sentences)
+
+
+def queries(rnd: random.Random, n: int) -> str:
+    """Generate a document of 20n short texts (of 5-30 chars), one per line, such as search queries or tweets."""
+    lines = []
+
+    for _ in range(20 * n):
+        words = rnd.sample(_WORDS["en"], rnd.randint(1, 5))
+
+        if rnd.random() < 0.3:
+            words[0] = rnd.choice(["#", "@"]) + words[0]
+
+        line = " ".join(words)[:30].strip() + rnd.choice(["", "", "?", "!!"])
+        lines.append(line if len(line) >= 5 else line + " " + rnd.choice(_STARTERS["en"]))
+
+    return "\n".join(lines)
+
+
+CORPORA: Dict[str, Callable[[random.Random, int], str]] = {
+    "en": lambda rnd, n: prose(rnd, "en", n),
+    "de": lambda rnd, n: prose(rnd, "de", n),
+    "es": lambda rnd, n: prose(rnd, "es", n),
+    "scientific": scientific,
+    "legal": legal,
+    "long_paragraph": lambda rnd, n: long_paragraph(rnd, 20 * n),
+    "queries": queries,
+}
+"""The synthetic corpora, as functions generating a document of about n sentences."""
+
+
+def corpus(name: str, documents: int = 20, sentences: int = 50, seed: int = 42) -> Corpus:
+    """
+    Generate a synthetic corpus.
+
+    :param name: of the corpus (see `CORPORA`)
+    :param documents: number of documents to generate
+    :param sentences: approx. number of sentences per document
+    :param seed: of the random number generator
+    :return: the list of documents
+    """
+    rnd = random.Random(seed)
+    return [CORPORA[name](rnd, sentences) for _ in range(documents)]
+
+
+def _wrap(text: str, width: int = 100) -> str:
+    """Break lines at the first space after every `width` characters, as found in plain-text files."""
+    lines = []
+    start = 0
+
+    while len(text) - start > width:
+        end = text.find(" ", start + width)
+
+        if end == -1:
+            break
+
+        lines.append(text[start:end])
+        start = end + 1
+
+    lines.append(text[start:])
+    return "\n".join(lines)
+
+
+def _insert(rnd: random.Random, text: str, insertions: Sequence[str], rate: float) -> str:
+    """Insert one of the `insertions` after a `rate` fraction of the spaces in the text."""
+    return "".join(
+        part + (" " + rnd.choice(insertions) + " " if rnd.random() < rate else " ")
+        for part in text.split(" ")
+    )[:-1]
+
+
+def _tokenize(document: str) -> Tuple[int, int]:
+    return sum(1 for _ in Tokenizer().tokenize(document)), 0
+
+
+_BATCH_TOKENIZER = Tokenizer()
+"""Tokenizes all batches (as when streaming them), so its cache of chunk splits is reused."""
+
+
+def _tokenize_lines(document: str) -> Tuple[int, int]:
+    tokenizer = Tokenizer()
+    return sum(sum(1 for _ in tokenizer.tokenize(line)) for line in document.splitlines()), 0
+
+
+def _tokenize_batch(document: str) -> Tuple[int, int]:
+    return len(_BATCH_TOKENIZER.tokenize_batch(document.splitlines())), 0
+
+
+def _split_lines(document: str) -> Tuple[int, int]:
+    tokenizer = Tokenizer()
+    sentences = [sentence for line in document.splitlines() for sentence in segmenter.split(tokenizer.tokenize(line))]
+    return sum(map(len, sentences)), len(sentences)
+
+
+def _split_batch(document: str) -> Tuple[int, int]:
+    tokens, spans = segmenter.split_batch(document.splitlines(), tokenizer=_BATCH_TOKENIZER)
+    return sum(spans[1::2]) - sum(spans[::2]), len(spans) // 2
+
+
+def _table(document: str) -> Tuple[int, int]:
+    table = segmenter.analyze_table([document], workers=1)
+    return len(table.start), len(set(zip(table.paragraph, table.sentence)))
+
+
+def _segment(tokens: List[Token]) -> Tuple[int, int]:
+    sentences = list(segmenter.segment(iter(tokens)))
+    return sum(map(len, sentences)), len(sentences)
+
+
+def _paragraphs(paragraphs: Iterable[Iterable[List[Token]]]) -> Tuple[int, int]:
+    sentences = [sentence for paragraph in paragraphs for sentence in paragraph]
+    return sum(map(len, sentences)), len(sentences)
+
+
+FUNCTIONS: Dict[str, Function] = {
+    "tokenize": _tokenize,
+    "segment": _segment,  # benchmarked on the (pre-tokenized) Tokens of the documents
+    "process": lambda document: _paragraphs(segmenter.process(document)),
+    "analyze": lambda document: _paragraphs(segmenter.analyze(document)),
+    "analyze_table": _table,
+    # each line of the documents as a text of its own, one by one or as a batch:
+    "tokenize_lines": _tokenize_lines,
+    "tokenize_batch": _tokenize_batch,
+    "split_lines": _split_lines,
+    "split_batch": _split_batch,
+}
+"""The benchmarked functions, by name."""
+
+
+def benchmark(name: str, function: Function, documents: Corpus, repeat: int = 3) -> Dict[str, Any]:
+    """
+    Benchmark a function over a corpus.
+
+    The latency of each document is the fastest of `repeat` runs,
+    and the peak memory is measured in an extra run, with `tracemalloc`.
+
+    :param name: of the function (see `FUNCTIONS`)
+    :param function: to benchmark
+    :param documents: to run the function over
+    :param repeat: the runs over each document
+    :return: a dictionary of the results
+    """
+    inputs: List[Any] = documents
+
+    if name == "segment":
+        tokenizer = Tokenizer()
+        inputs = [list(tokenizer.tokenize(document)) for document in documents]
+
+    latencies = []
+    tokens = sentences = 0
+
+    for item in inputs:
+        best = float("inf")
+
+        for _ in range(repeat):
+            start = time.perf_counter()
+            counts = function(item)
+            best = min(best, time.perf_counter() - start)
+
+        latencies.append(best)
+        tokens += counts[0]
+        sentences += counts[1]
+
+    peak = 0
+    tracemalloc.start()
+
+    for item in inputs:
+        if hasattr(tracemalloc, "reset_peak"):  # Python 3.9+
+            tracemalloc.reset_peak()
+        else:
+            tracemalloc.clear_traces()
+
+        function(item)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+
+    tracemalloc.stop()
+    seconds = sum(latencies)
+    latencies.sort()
+    return {
+        "function": name,
+        "documents": len(documents),
+        "characters": sum(map(len, documents)),
+        "tokens": tokens,
+        "sentences": sentences if not name.startswith("tokenize") else None,
+        "seconds": seconds,
+        "tokens_per_second": tokens / seconds if seconds else None,
+        "sentences_per_second": sentences / seconds if seconds and not name.startswith("tokenize") else None,
+        "latency_ms": {p: 1000 * _percentile(latencies, q) for p, q in (("p50", 50), ("p90", 90), ("p99", 99))},
+        "peak_memory_bytes": peak,
+    }
+
+
+def run(
+    corpora: Dict[str, Corpus], functions: Optional[Sequence[str]] = None, repeat: int = 3
+) -> Dict[str, Any]:
+    """
+    Benchmark the functions over all corpora.
+
+    :param corpora: to benchmark, by name
+    :param functions: names of the functions to benchmark (default: all `FUNCTIONS`)
+    :param repeat: the runs over each document
+    :return: a JSON-serializable dictionary of the environment and the results
+    """
+    results = []
+
+    for corpus_name, documents in corpora.items():
+        for name in functions or FUNCTIONS:
+            result = benchmark(name, FUNCTIONS[name], documents, repeat)
+            result["corpus"] = corpus_name
+            results.append(result)
+
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def regressions(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.2) -> List[str]:
+    """
+    Compare the results to a baseline.
+
+    :param results: of a `run`
+    :param baseline: results of an earlier `run`
+    :param tolerance: the fraction the throughput may drop before it is reported
+    :return: a description of each (corpus, function) pair whose tokens/s dropped by more than the tolerance
+    """
+    before = {(r["corpus"], r["function"]): r["tokens_per_second"] for r in baseline["results"]}
+    found = []
+
+    for result in results["results"]:
+        key = (result["corpus"], result["function"])
+        now, then = result["tokens_per_second"], before.get(key)
+
+        if then and now is not None and now < (1 - tolerance) * then:
+            found.append("%s %s: %.0f tokens/s < %.0f tokens/s" % (key[0], key[1], now, then))
+
+    return found
+
+
+_COLD_START = """
+import time
+start = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+from syntok import segmenter
+[list(paragraph) for paragraph in segmenter.analyze("Hello World. This is it!")]
+print(imported - start, time.perf_counter() - start)
+"""
+
+
+def import_time(module: str = "syntok.segmenter", repeat: int = 5) -> Dict[str, Any]:
+    """
+    Benchmark the cold start of (short-lived) worker processes, each in a fresh Python interpreter.
+
+    :param module: to import
+    :param repeat: the number of interpreters to start; the fastest run is used
+    :return: a dictionary of the time to import the module, and to segment a first (short) text after starting the import
+    """
+    runs = []
+
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", _COLD_START.format(module=module)], stdout=subprocess.PIPE, check=True,
+            universal_newlines=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        ).stdout
+        runs.append([float(seconds) for seconds in output.split()])
+
+    return {
+        "module": module,
+        "import_ms": 1000 * min(run[0] for run in runs),
+        "first_segmentation_ms": 1000 * min(run[1] for run in runs),
+    }
+
+
+def _percentile(values: List[float], percent: int) -> float:
+    """The nearest-rank percentile of the sorted `values`."""
+    if not values:
+        return 0.0
+
+    return values[max(0, -(-percent * len(values) // 100) - 1)]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python3 -m syntok.bench", description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("files", nargs="*", help="text files to benchmark as additional (single document) corpora")
+    parser.add_argument("--corpus", action="append", choices=sorted(CORPORA), help="synthetic corpora to use (default: all)")
+    parser.add_argument("--function", action="append", choices=sorted(FUNCTIONS), help="functions to benchmark (default: all)")
+    parser.add_argument("--documents", type=int, default=20, help="number of documents per synthetic corpus")
+    parser.add_argument("--sentences", type=int, default=50, help="approx. number of sentences per synthetic document")
+    parser.add_argument("--repeat", type=int, default=3, help="runs over each document; the fastest one is used")
+    parser.add_argument("--seed", type=int, default=42, help="of the synthetic corpora")
+    parser.add_argument("--baseline", help="JSON results to compare to; exits with status 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed drop in tokens/s compared to the baseline")
+    parser.add_argument("--import-time", action="store_true", help="also benchmark the cold start (import) of syntok")
+    args = parser.parse_args()
+
+    corpora = {name: corpus(name, args.documents, args.sentences, args.seed) for name in args.corpus or CORPORA}
+
+    for filename in args.files:
+        with open(filename, "rt") as handle:
+            corpora[filename] = [handle.read()]
+
+    output = run(corpora, args.function, args.repeat)
+
+    if args.import_time:
+        output["import"] = [import_time(module, 2 * args.repeat) for module in ("syntok.tokenizer", "syntok.segmenter")]
+
+    json.dump(output, sys.stdout, indent=2)
+    print("")
+
+    if args.baseline:
+        with open(args.baseline, "rt") as handle:
+            slower = regressions(output, json.load(handle), args.tolerance)
+
+        for line in slower:
+            print(line, file=sys.stderr)
+
+        sys.exit(1 if slower else 0)
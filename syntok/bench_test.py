@@ -0,0 +1,69 @@
+from unittest import TestCase
+
+from syntok import bench
+
+
+class TestCorpora(TestCase):
+    def test_corpus_is_reproducible(self):
+        for name in bench.CORPORA:
+            self.assertListEqual(bench.corpus(name, 2, 5), bench.corpus(name, 2, 5), name)
+
+    def test_corpus(self):
+        documents = bench.corpus("de", 3, 12)
+        self.assertEqual(3, len(documents))
+        self.assertEqual(1, documents[0].count("\n\n"))
+
+    def test_long_paragraph(self):
+        self.assertNotIn("\n\n", bench.corpus("long_paragraph", 1, 5)[0])
+
+
+class TestBenchmark(TestCase):
+    def test_run(self):
+        corpora = {"scientific": bench.corpus("scientific", 2, 5)}
+        results = bench.run(corpora, repeat=1)["results"]
+        self.assertListEqual(list(bench.FUNCTIONS), [r["function"] for r in results])
+
+        for result in results:
+            self.assertEqual("scientific", result["corpus"])
+            self.assertEqual(2, result["documents"])
+            self.assertGreater(result["tokens_per_second"], 0)
+            self.assertGreater(result["peak_memory_bytes"], 0)
+            self.assertLessEqual(result["latency_ms"]["p50"], result["latency_ms"]["p99"])
+
+        self.assertIsNone(results[0]["sentences"])
+        self.assertEqual(results[1]["sentences"], results[3]["sentences"])
+        self.assertEqual(results[0]["tokens"], results[1]["tokens"])
+        self.assertEqual(results[3]["tokens"], results[4]["tokens"])  # analyze and analyze_table
+        self.assertEqual(results[3]["sentences"], results[4]["sentences"])
+
+    def test_batch(self):
+        documents = bench.corpus("queries", 2, 5)
+        self.assertEqual(100, documents[0].count("\n") + 1)
+
+        for document in documents:
+            self.assertEqual(bench.FUNCTIONS["tokenize_lines"](document), bench.FUNCTIONS["tokenize_batch"](document))
+            self.assertEqual(bench.FUNCTIONS["split_lines"](document), bench.FUNCTIONS["split_batch"](document))
+
+    def test_import_time(self):
+        result = bench.import_time("syntok.tokenizer", 1)
+        self.assertEqual("syntok.tokenizer", result["module"])
+        self.assertGreater(result["import_ms"], 0)
+        self.assertGreater(result["first_segmentation_ms"], result["import_ms"])
+
+    def test_regressions(self):
+        baseline = {"results": [
+            {"corpus": "en", "function": "tokenize", "tokens_per_second": 100.0},
+            {"corpus": "en", "function": "analyze", "tokens_per_second": 100.0},
+        ]}
+        results = {"results": [
+            {"corpus": "en", "function": "tokenize", "tokens_per_second": 85.0},
+            {"corpus": "en", "function": "analyze", "tokens_per_second": 75.0},
+            {"corpus": "de", "function": "analyze", "tokens_per_second": 1.0},
+        ]}
+        self.assertListEqual(["en analyze: 75 tokens/s < 100 tokens/s"], bench.regressions(results, baseline, 0.2))
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(50, bench._percentile(values, 50))
+        self.assertEqual(99, bench._percentile(values, 99))
+        self.assertEqual(7, bench._percentile([7], 90))
@@ -0,0 +1,172 @@
+"""
+Language packs of the words the segmenter needs to know: abbreviations,
+month abbreviations, sentence starters, and roman numerals.
+
+The packs for English ("en"), German ("de"), and Spanish ("es") come with syntok,
+and any other lexicon can be loaded from a (UTF-8 encoded) file of the same format:
+One "[section]" header per field of a `Lexicon`, each followed by the
+whitespace-separated words of that section, where "#" starts a comment::
+
+    [abbreviations]
+    approx cf Dr etc  # without the trailing dot
+
+    [starters]
+    However Therefore
+
+Lexicons are only read when loaded, and can be combined; once parsed,
+a lexicon file is cached (in memory and on disk), so loading large
+domain lexicons again does not have to parse them.
+
+Basic example::
+
+    from syntok.lexicon import load
+    from syntok.segmenter import Segmenter
+
+    segmenter = Segmenter(load("en", "legal.txt").config())
+"""
+import hashlib
+import marshal
+import os
+import tempfile
+from typing import Dict, FrozenSet, Iterable, NamedTuple, Optional, Tuple
+
+from syntok._segmentation_states import SegmenterConfig, State
+
+LANGUAGES = ("en", "de", "es")
+"""The languages of the lexicons that come with syntok."""
+
+CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "syntok")
+"""The default directory to cache parsed lexicon files in."""
+
+_FORMAT = 1
+"""The version of the format of the cached lexicons, to change when `Lexicon` changes."""
+
+
+class Lexicon(NamedTuple):
+    """The words the segmenter needs to know, as (fast to look up) sets."""
+
+    abbreviations: FrozenSet[str] = frozenset()
+    """Abbreviations with no dots inside."""
+
+    months: FrozenSet[str] = frozenset()
+    """Month abbreviations."""
+
+    starters: FrozenSet[str] = frozenset()
+    """Uppercase words that indicate a sentence start."""
+
+    roman_numerals: FrozenSet[str] = frozenset()
+    """Roman numerals (used as enumerations)."""
+
+    def union(self, *others: "Lexicon") -> "Lexicon":
+        """Combine this and the `others` lexicons into one."""
+        return Lexicon(*(frozenset().union(*words) for words in zip(self, *others)))
+
+    def config(self, max_bracket_skipping_length: int = State.max_bracket_skipping_length) -> SegmenterConfig:
+        """A `SegmenterConfig` to segment with this lexicon."""
+        return SegmenterConfig(
+            max_bracket_skipping_length, self.abbreviations, self.months, self.starters, self.roman_numerals
+        )
+
+
+_loaded: Dict[Tuple[str, int, int], Lexicon] = {}
+"""The lexicon files read so far, by (path, size, modification time)."""
+
+
+def load(*sources: str, cache_dir: Optional[str] = CACHE_DIR) -> Lexicon:
+    """
+    Load and combine lexicons.
+
+    :param sources: language names (see `LANGUAGES`) or paths of lexicon files
+    :param cache_dir: directory to cache the parsed lexicon files in (None: do not cache them on disk)
+    :return: the union of the lexicons
+    """
+    return Lexicon().union(*(_read(_path(source), cache_dir) for source in sources))
+
+
+def parse(lines: Iterable[str]) -> Lexicon:
+    """
+    Parse the lines of a lexicon file.
+
+    :param lines: of the lexicon
+    :return: the lexicon
+    :raise ValueError: if a section is unknown or if there are words before the first section
+    """
+    sections: Dict[str, set] = {field: set() for field in Lexicon._fields}
+    words: Optional[set] = None
+
+    for number, line in enumerate(lines, 1):
+        line = line.split("#", 1)[0].strip()
+
+        if line.startswith("[") and line.endswith("]"):
+            if line[1:-1] not in sections:
+                raise ValueError("unknown lexicon section {} on line {}".format(line, number))
+
+            words = sections[line[1:-1]]
+        elif line:
+            if words is None:
+                raise ValueError("words before the first lexicon section on line {}".format(number))
+
+            words.update(line.split())
+
+    return Lexicon(**{field: frozenset(words) for field, words in sections.items()})
+
+
+def _path(source: str) -> str:
+    """The path of the lexicon file of a `source` language or path."""
+    if source in LANGUAGES:
+        return os.path.join(os.path.dirname(__file__), "lexicons", source + ".txt")
+
+    return source
+
+
+def _read(path: str, cache_dir: Optional[str]) -> Lexicon:
+    """Read the lexicon file at `path`, unless it is cached (and unchanged)."""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    lexicon = _loaded.get(key)
+
+    if lexicon is None:
+        cache = None if cache_dir is None else os.path.join(
+            cache_dir, hashlib.sha1(repr(key).encode("utf-8")).hexdigest() + ".lexicon"
+        )
+        lexicon = _read_cache(cache)
+
+        if lexicon is None:
+            with open(path, encoding="utf-8") as lines:
+                lexicon = parse(lines)
+
+            _write_cache(cache, lexicon)
+
+        _loaded[key] = lexicon
+
+    return lexicon
+
+
+def _read_cache(cache: Optional[str]) -> Optional[Lexicon]:
+    """Read a lexicon from its `cache` file, if it exists and has the current format."""
+    if cache is not None:
+        try:
+            with open(cache, "rb") as handle:
+                version, words = marshal.loads(handle.read())
+
+            if version == _FORMAT:
+                return Lexicon(*words)
+        except (OSError, EOFError, ValueError, TypeError):
+            pass  # a missing or broken cache file is no error: the lexicon is read instead
+
+    return None
+
+
+def _write_cache(cache: Optional[str], lexicon: Lexicon) -> None:
+    """Write a lexicon to its `cache` file, atomically, if possible."""
+    if cache is not None:
+        try:
+            os.makedirs(os.path.dirname(cache), exist_ok=True)
+
+            with tempfile.NamedTemporaryFile(dir=os.path.dirname(cache), delete=False) as handle:
+                handle.write(marshal.dumps((_FORMAT, tuple(lexicon))))
+
+            os.replace(handle.name, cache)
+        except OSError:
+            pass  # e.g., a read-only file system: just do not cache the lexicon
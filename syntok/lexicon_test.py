@@ -0,0 +1,64 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from syntok import lexicon
+from syntok._segmentation_states import State
+from syntok.segmenter import Segmenter
+from syntok.tokenizer import Tokenizer
+
+
+class TestLexicon(TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.directory.name, "cache")
+        self.path = os.path.join(self.directory.name, "domain.txt")
+
+        with open(self.path, "wt", encoding="utf-8") as handle:
+            handle.write("# a domain lexicon\n[abbreviations]\nAbc  Def # comment\n\n[starters]\nWhereupon\n")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_languages(self):
+        combined = lexicon.load(*lexicon.LANGUAGES, cache_dir=None)
+        self.assertEqual(State.abbreviations, combined.abbreviations)
+        self.assertEqual(State.months, combined.months)
+        self.assertEqual(State.starters, combined.starters)
+        self.assertEqual(State.roman_numerals, combined.roman_numerals)
+
+    def test_load(self):
+        domain = lexicon.load("en", self.path, cache_dir=self.cache_dir)
+        self.assertIn("Abc", domain.abbreviations)
+        self.assertIn("Whereupon", domain.starters)
+        self.assertIn("Dr", domain.abbreviations)
+        self.assertNotIn("bzw", domain.abbreviations)
+        self.assertEqual(frozenset(), lexicon.load(self.path, cache_dir=None).months)
+
+    def test_cache(self):
+        expected = lexicon.load(self.path, cache_dir=self.cache_dir)
+        self.assertEqual(1, len(os.listdir(self.cache_dir)))
+        lexicon._loaded.clear()
+        self.assertEqual(expected, lexicon.load(self.path, cache_dir=self.cache_dir))
+
+        with open(self.path, "at", encoding="utf-8") as handle:
+            handle.write("[months]\nJnr\n")
+
+        self.assertIn("Jnr", lexicon.load(self.path, cache_dir=self.cache_dir).months)
+
+    def test_parse_errors(self):
+        self.assertRaises(ValueError, lexicon.parse, ["[unknown]"])
+        self.assertRaises(ValueError, lexicon.parse, ["Abc", "[abbreviations]"])
+
+    def test_union(self):
+        a = lexicon.Lexicon(abbreviations=frozenset(["a"]))
+        b = lexicon.Lexicon(abbreviations=frozenset(["b"]), months=frozenset(["c"]))
+        self.assertEqual(lexicon.Lexicon(frozenset("ab"), frozenset("c")), a.union(b))
+
+    def test_segmenter(self):
+        text = "This is an Abc. Thing in it."
+        english = Segmenter(lexicon.load("en", cache_dir=None).config())
+        domain = Segmenter(lexicon.load("en", self.path, cache_dir=self.cache_dir).config())
+        self.assertEqual(2, len(english.split(Tokenizer().tokenize(text))))
+        self.assertEqual(1, len(domain.split(Tokenizer().tokenize(text))))
@@ -1,14 +1,460 @@
-from typing import Iterator, List, Tuple
+import codecs
+import mmap
+import os
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from itertools import accumulate, chain, islice, repeat
+from operator import add, attrgetter
+from typing import (
+    TYPE_CHECKING, Any, AsyncIterable, AsyncIterator, Callable, Deque, Dict, Iterable, Iterator, List, NamedTuple,
+    Optional, Tuple, TypeVar, Union, cast
+)
 
-import regex
+from syntok._segmentation_states import (
+    Instrumentation, InstrumentedState, SegmenterConfig, SpanHistory, State, TokenStream
+)
+from syntok.tokenizer import (
+    BytesLike, Token, TokenArray, TokenBatch, Tokenizer, Utf8Offsets, _blocks, _LazyPattern, _mapped, _SourceToken
+)
 
-from syntok._segmentation_states import Begin, State
-from syntok.tokenizer import Token, Tokenizer
+if TYPE_CHECKING:
+    from concurrent.futures import Executor, Future
 
-__PARAGRAPH_SEP = regex.compile("\r?\n(?:\\s*\r?\n)+")
 
+class _Patterns:
+    """The regex patterns of the module, compiled when first used."""
 
-def analyze(document: str, bracket_skip_len=None) -> Iterator[Iterator[List[Token]]]:
+    paragraph_separator = _LazyPattern("\r?\n(?:\\s*\r?\n)+")
+    last_non_space = _LazyPattern(r"\S", reverse=True)
+    terminal_or_bracket = _LazyPattern(
+        "[" + "".join(sorted(set("".join(State.terminals)) | State.opening_brackets)).replace("[", "\\[") + "]",
+        backend="re"
+    )
+
+
+_TABLE_MAGIC = b"SYNTOKT1"
+_OFFSET = attrgetter("offset")
+_VALUE = attrgetter("value")
+
+H = TypeVar("H", List[Token], SpanHistory)
+R = TypeVar("R")
+D = TypeVar("D")
+
+Paragraphs = List[List[List[Token]]]
+"""A segmented document: a list of paragraphs as lists of sentences as lists of Tokens."""
+
+CompactParagraphs = Tuple[array, array, array, array, array, array]
+"""
+A segmented document as the TokenArray columns of its sentences,
+the (start, end) index ranges of the sentences in these columns,
+and the number of sentences up to and including each paragraph.
+"""
+
+TABLE_FORMATS = ("parquet", "arrow", "offsets")
+"""
+The file formats of `write_table`: Parquet and Arrow IPC (which require pyarrow),
+or syntok's own binary offset table format (see `read_table`).
+"""
+
+
+class OffsetTable(NamedTuple):
+    """
+    Analyzed documents as a columnar table with a row for each Token (see `analyze_table`).
+
+    All columns but the `values` dictionary are arrays (of 64 bit integers) with one item per Token.
+    """
+
+    document: array
+    """The number of the document of the Token (counting from 0)."""
+
+    paragraph: array
+    """The index of the paragraph of the Token in its document."""
+
+    sentence: array
+    """The index of the sentence of the Token in its paragraph."""
+
+    start: array
+    """The offset of the Token in its document."""
+
+    end: array
+    """The offset of the end of the Token in its document."""
+
+    value: array
+    """The index of the value of the Token in the `values`."""
+
+    values: List[str]
+    """The (distinct) values of the Tokens."""
+
+
+class Segmenter:
+    """
+    Segment documents and Token streams with an immutable configuration.
+
+    As the configuration is never altered, a Segmenter can be shared
+    by any number of threads or tasks, each using their own settings.
+    """
+
+    __slots__ = ("_config", "_instrumentation")
+
+    def __init__(
+        self, config: Optional[SegmenterConfig] = None, instrumentation: Optional[Instrumentation] = None
+    ) -> None:
+        """
+        :param config: to use; defaults to the `State` class attributes
+        :param instrumentation: to record the segmentation decisions in (which slows down segmentation);
+                                note that segmentation in other processes (`workers`) is not recorded
+        """
+        self._config = config
+        self._instrumentation = instrumentation
+
+    @property
+    def config(self) -> Optional[SegmenterConfig]:
+        """The configuration of the segmentation state machine, if not the default."""
+        return self._config
+
+    @property
+    def instrumentation(self) -> Optional[Instrumentation]:
+        """The statistics of the segmentation decisions, if recorded."""
+        return self._instrumentation
+
+    def analyze(self, document: Union[str, BytesLike], workers: Optional[int] = 1) -> Iterator[Iterator[List[Token]]]:
+        """See `syntok.segmenter.analyze`."""
+        if not isinstance(document, str):
+            text = str(document, "utf-8")
+            offsets = Utf8Offsets(text)
+
+            for paragraph in self.analyze(text, workers):
+                yield _byte_offsets(paragraph, offsets)
+
+            return
+
+        if workers != 1:
+            chunk_chars = _paragraph_chunk_chars(document, workers)
+            paragraphs = preprocess_with_offsets(document)
+
+            for _, result in _map_chunks(_analyze_paragraphs, paragraphs, self, workers, chunk_chars, _size):
+                yield iter(next(_expand(result, lambda _: [document])))
+
+            return
+
+        tok = Tokenizer(replace_not_contraction=False)
+
+        for start, end in paragraph_spans(document):
+            tokens = tok.tokenize_window(document, start, end)
+            yield self.segment(tokens)
+
+    def analyze_file(
+        self, path: str, start: int = 0, end: Optional[int] = None, block_size: int = 1 << 20
+    ) -> Iterator[Iterator[List[Token]]]:
+        """See `syntok.segmenter.analyze_file`."""
+        tok = Tokenizer(replace_not_contraction=False)
+
+        with _mapped(path) as data:
+            for offset, paragraph in _file_paragraphs(data, start, block_size):
+                if end is not None and offset >= end:
+                    break  # the paragraphs from here on belong to the next region
+
+                if offset >= start:
+                    # segment by character offsets (as the bracket skipping length counts characters)
+                    yield _byte_offsets(self.segment(tok.tokenize_window(paragraph)), Utf8Offsets(paragraph, offset))
+
+    def process(self, document: str, workers: Optional[int] = 1) -> Iterator[Iterator[List[Token]]]:
+        """See `syntok.segmenter.process`."""
+        if workers != 1:
+            chunk_chars = _paragraph_chunk_chars(document, workers)
+
+            for paragraph, result in _map_chunks(_process_paragraphs, preprocess(document), self, workers, chunk_chars):
+                yield iter(next(_expand(result, lambda _: [paragraph])))
+
+            return
+
+        tok = Tokenizer()
+
+        for paragraph in preprocess(document):
+            yield self.segment(tok.tokenize(paragraph))
+
+    def split(self, tokens: Iterator[Token]) -> List[List[Token]]:
+        """See `syntok.segmenter.split`."""
+        return list(self.segment(tokens))
+
+    def segment(self, tokens: Iterator[Token]) -> Iterator[List[Token]]:
+        """See `syntok.segmenter.segment`."""
+        return self._segment(tokens, [])
+
+    def segment_spans(self, tokens: Iterator[Token]) -> Iterator[Tuple[int, int]]:
+        """See `syntok.segmenter.segment_spans`."""
+        for sentence in self._segment(tokens, SpanHistory()):
+            first, last = cast(Token, sentence.first), cast(Token, sentence.last)
+
+            if last.value:
+                yield first.offset, last.offset + len(last.value)
+            else:  # a trailing Token without a value ends where its spacing starts
+                yield first.offset, last.offset - len(last.spacing)
+
+    def sentence_spans(self, document: str) -> Iterator[Tuple[int, int]]:
+        """See `syntok.segmenter.sentence_spans`."""
+        tok = Tokenizer(replace_not_contraction=False)
+
+        for windows in _chunks(paragraph_spans(document), 1 << 13, lambda window: window[1] - window[0]):
+            tokens = tok.tokenize_batch([document[start:end] for start, end in windows])
+            marked = _marked(tokens)
+
+            for text, (start, _) in enumerate(windows):
+                shift = start - tokens.offsets[text]
+
+                for first, last in self.segment_spans(_SpanTokens(tokens, text, marked)):
+                    yield first + shift, last + shift
+
+    def segment_array(self, tokens: TokenArray) -> Iterator[Tuple[int, int]]:
+        """See `syntok.segmenter.segment_array`."""
+        start = 0
+
+        for sentence in self.segment(iter(tokens)):
+            end = start + len(sentence)
+            yield start, end
+            start = end
+
+    def split_batch(self, texts: Iterable[str], tokenizer: Optional[Tokenizer] = None) -> Tuple[TokenBatch, array]:
+        """
+        See `syntok.segmenter.split_batch`.
+
+        :param tokenizer: to tokenize the texts with (default: a `Tokenizer()`)
+        """
+        tokens = (tokenizer or Tokenizer()).tokenize_batch(texts)
+        stream = iter(tokens)
+        spans = array("q")
+
+        for index, start in enumerate(tokens.boundaries[:-1]):
+            for sentence in self.segment(islice(stream, tokens.size(index))):
+                spans.append(start)
+                start += len(sentence)
+                spans.append(start)
+
+        return tokens, spans
+
+    def analyze_many(
+        self, documents: Iterable[str], workers: Optional[int] = None, chunk_chars: int = 1 << 20
+    ) -> Iterator[Paragraphs]:
+        """See `syntok.segmenter.analyze_many`."""
+        for document, result in _map_chunks(_analyze_chunk, documents, self, workers, chunk_chars):
+            yield list(_expand(result, lambda count: [document] * count))
+
+    def process_many(
+        self, documents: Iterable[str], workers: Optional[int] = None, chunk_chars: int = 1 << 20
+    ) -> Iterator[Paragraphs]:
+        """See `syntok.segmenter.process_many`."""
+        for document, result in _map_chunks(_process_chunk, documents, self, workers, chunk_chars):
+            yield list(_expand(result, lambda _: preprocess(document)))
+
+    def sentence_spans_many(
+        self, documents: Iterable[str], workers: Optional[int] = None, chunk_chars: int = 1 << 20
+    ) -> Iterator[List[Tuple[int, int]]]:
+        """See `syntok.segmenter.sentence_spans_many`."""
+        for _, spans in _map_chunks(_sentence_spans_chunk, documents, self, workers, chunk_chars):
+            yield list(zip(spans[::2], spans[1::2]))
+
+    def analyze_table(
+        self, documents: Iterable[str], workers: Optional[int] = None, chunk_chars: int = 1 << 20
+    ) -> OffsetTable:
+        """See `syntok.segmenter.analyze_table`."""
+        columns: List[List[int]] = [[] for _ in range(6)]  # growing lists is much faster than growing arrays
+        ids = _Ids()
+
+        if workers == 1:
+            for number, document in enumerate(documents):
+                for paragraph, sentences in enumerate(self.analyze(document)):
+                    for sentence, tokens in enumerate(sentences):
+                        starts = list(map(_OFFSET, tokens))
+                        _add_rows(columns, ids, (number, paragraph, sentence), starts, list(map(_VALUE, tokens)))
+        else:
+            for number, (document, result) in enumerate(
+                _map_chunks(_analyze_chunk, documents, self, workers, chunk_chars)
+            ):
+                _, all_starts, all_ends, _, spans, paragraphs = result
+                first = 0
+
+                for paragraph, last in enumerate(paragraphs):
+                    for sentence, index in enumerate(range(first, last)):
+                        begin, end = spans[2 * index], spans[2 * index + 1]
+                        starts = all_starts[begin:end].tolist()
+                        values = list(map(document.__getitem__, map(slice, starts, all_ends[begin:end])))
+                        _add_rows(columns, ids, (number, paragraph, sentence), starts, values)
+
+                    first = last
+
+        return OffsetTable._make(chain((array("q", column) for column in columns), [list(ids)]))
+
+    async def asegment(
+        self, chunks: AsyncIterable[Union[str, bytes]], tokenizer: Optional[Tokenizer] = None,
+        encoding: str = "utf-8", slice_chars: int = 1 << 14
+    ) -> AsyncIterator[List[Token]]:
+        """
+        See `syntok.segmenter.asegment`.
+
+        :param tokenizer: to tokenize the chunks with (default: a `Tokenizer()`)
+        :param slice_chars: max. number of characters to segment before giving control back to the event loop
+        """
+        import asyncio  # not imported with the module, as it takes a while (but the event loop already did)
+
+        incremental = SentenceSegmenter(self, tokenizer)
+        decode = codecs.getincrementaldecoder(encoding)().decode
+
+        textual = None  # if the chunks are str (or bytes)
+
+        async for chunk in chunks:
+            if textual is None:
+                textual = isinstance(chunk, str)
+            elif textual != isinstance(chunk, str):  # the decoder might be holding back bytes
+                raise TypeError("cannot mix str and bytes chunks")
+
+            text = chunk if isinstance(chunk, str) else decode(chunk)
+
+            for start in range(0, len(text), slice_chars):
+                for sentence in incremental.feed(text[start:start + slice_chars]):
+                    yield sentence
+
+                await asyncio.sleep(0)
+
+        for sentence in incremental.feed(decode(b"", True)) + incremental.flush():
+            yield sentence
+
+    async def aanalyze(
+        self, document: str, executor: Optional["Executor"] = None, slice_chars: int = 1 << 14
+    ) -> AsyncIterator[List[List[Token]]]:
+        """
+        See `syntok.segmenter.aanalyze`.
+
+        :param slice_chars: approx. number of characters to segment before giving control back to the event loop
+        """
+        import asyncio  # see `asegment`
+
+        paragraphs: Iterator[Iterable[List[Token]]]
+
+        if executor is not None:
+            result, = await asyncio.get_event_loop().run_in_executor(executor, _analyze_chunk, [document], self)
+            paragraphs = _expand(result, lambda count: [document] * count)
+        else:
+            tok = Tokenizer(replace_not_contraction=False)
+            paragraphs = (self.segment(tok.tokenize_window(document, start, end))
+                          for start, end in paragraph_spans(document))
+
+        resumed = 0  # the offset where the event loop last gave back control
+
+        for paragraph in paragraphs:
+            sentences = []
+
+            for sentence in paragraph:
+                sentences.append(sentence)
+
+                if sentence[-1].offset - resumed >= slice_chars:
+                    await asyncio.sleep(0)
+                    resumed = sentence[-1].offset
+
+            yield sentences
+
+    def _machine(self, tokens: Iterator[Token], history: H) -> State:
+        """The segmentation state machine for the Token stream."""
+        if self._instrumentation is None:
+            return State(tokens, history, self._config)
+
+        return InstrumentedState(tokens, history, self._config, self._instrumentation)
+
+    def _segment(self, tokens: Iterator[Token], history: H) -> Iterator[H]:
+        """Stream Token streams into sentence productions collected with the (empty) `history`."""
+        for production in self._machine(tokens, history):
+            if len(production) > 1 or production[-1].value:
+                yield cast(H, production)
+
+
+class SentenceSegmenter:
+    """
+    Incrementally segment text arriving in chunks into sentences of Tokens.
+
+    Each `feed` returns the sentences whose end has become certain, with the
+    offsets of their Tokens in the whole text, and `flush` returns the rest.
+    Text is tokenized only once, holding back only its trailing (unfinished) word,
+    and the segmentation state machine is suspended whenever it runs out of Tokens
+    and resumed on the next `feed`, so each Token is segmented (about) once, too.
+    """
+
+    __slots__ = ("_segmenter", "_tokenizer", "_text", "_offset", "_stream", "_machine")
+
+    _spacing = _LazyPattern(r"[\s\u200b]+", reverse=True)
+    """The last spacing in a text; the Tokens before it are complete."""
+
+    def __init__(self, segmenter: Optional[Segmenter] = None, tokenizer: Optional[Tokenizer] = None) -> None:
+        """
+        :param segmenter: to segment the Tokens with (default: a `Segmenter()`)
+        :param tokenizer: to tokenize the text with (default: a `Tokenizer()`)
+        """
+        self._segmenter = Segmenter() if segmenter is None else segmenter
+        self._tokenizer = Tokenizer() if tokenizer is None else tokenizer
+        self._text = ""  # not yet tokenized
+        self._offset = 0  # of the text not yet tokenized
+        self._stream = TokenStream()  # of the Tokens not yet read by the machine
+        self._machine: Optional[State] = None  # started at the first Token
+
+    def feed(self, text: str) -> List[List[Token]]:
+        """
+        Add the next chunk of the text.
+
+        :param text: the next chunk
+        :return: the sentences that have been completed so far
+        """
+        self._text += text
+        mo = SentenceSegmenter._spacing.search(self._text)
+
+        if mo is None or mo.start() == 0:
+            return []
+
+        self._tokenize(mo.start())
+        return self._segment()
+
+    def flush(self) -> List[List[Token]]:
+        """
+        End the text and reset the segmenter, so it can be fed the next text.
+
+        :return: the remaining sentences of the text
+        """
+        self._tokenize(len(self._text))
+        self._stream.close()
+        sentences = self._segment()
+        self._offset = 0
+        self._stream = TokenStream()
+        self._machine = None
+        return sentences
+
+    def _tokenize(self, end: int) -> None:
+        """Tokenize the text up to `end`, which must be the end of the text or of a word."""
+        offset = self._offset
+        tokens = list(self._tokenizer.tokenize_window(self._text, 0, end))
+
+        for token in tokens:
+            token.update(offset)
+
+        self._stream.extend(tokens)
+        self._text = self._text[end:]
+        self._offset += end
+
+    def _segment(self) -> List[List[Token]]:
+        """Resume the segmentation of the Tokens, returning the sentences completed so far."""
+        if self._machine is None:
+            if not self._stream.pending:
+                return []
+
+            self._machine = self._segmenter._machine(self._stream, [])
+
+        return [
+            cast(List[Token], sentence) for sentence in self._machine.resume()
+            if len(sentence) > 1 or sentence[-1].value
+        ]
+
+
+def analyze(
+    document: Union[str, BytesLike], bracket_skip_len=None, workers: Optional[int] = 1
+) -> Iterator[Iterator[List[Token]]]:
     """
     Segment a document into paragraphs, sentences, and tokens,
     all the while preserving the offsets of the tokens in the text.
@@ -17,18 +463,44 @@ def analyze(document: str, bracket_skip_len=None) -> Iterator[Iterator[List[Toke
     tokens when using this function, and the original input document
     `str` value is producible from the `Token` spacing and values.
 
+    If the document is bytes-like (e.g., bytes, a memoryview, or a mmap),
+    it is decoded from UTF-8 and the offsets of the tokens are byte offsets.
+
+    With more than one worker, the paragraphs of the document are segmented
+    concurrently in a pool of processes, and yielded in document order with
+    the same (global) offsets; this pays off for (very) large documents only.
+
     :param document: to process
     :param bracket_skip_len: n. chars of bracketed text inside sentences to skip over
+    :param workers: number of processes (1, the default, means no pool; None means one per CPU)
     :return: an iterator over paragraphs and sentences as lists of tokens
     """
-    tok = Tokenizer(replace_not_contraction=False)
+    return _segmenter(bracket_skip_len).analyze(document, workers)
 
-    for offset, paragraph in preprocess_with_offsets(document):
-        tokens = tok.tokenize(paragraph, offset)
-        yield segment(tokens, bracket_skip_len)
 
+def analyze_file(
+    path: str, bracket_skip_len=None, start: int = 0, end: Optional[int] = None
+) -> Iterator[Iterator[List[Token]]]:
+    """
+    Analyze the UTF-8 encoded file at `path` (see `analyze`), paragraph by paragraph,
+    with the byte offsets of the tokens in the file.
 
-def process(document: str, bracket_skip_len=None) -> Iterator[Iterator[List[Token]]]:
+    The file is memory-mapped, so the OS pages it in as needed, and only the current
+    paragraph is held in memory as text. To segment a (huge) file in several processes
+    that share the OS's page cache, each process can analyze a region of the file:
+    The paragraphs starting at the byte offsets `start <= offset < end` of the region,
+    so the regions `[0, a), [a, b), ..., [z, None)` segment each paragraph exactly once.
+
+    :param path: of the file to analyze
+    :param bracket_skip_len: n. chars of bracketed text inside sentences to skip over
+    :param start: byte offset of the region of the file to analyze
+    :param end: byte offset of the end of the region (exclusive; defaults to the end of the file)
+    :return: an iterator over paragraphs and sentences as lists of tokens
+    """
+    return _segmenter(bracket_skip_len).analyze_file(path, start, end)
+
+
+def process(document: str, bracket_skip_len=None, workers: Optional[int] = 1) -> Iterator[Iterator[List[Token]]]:
     """
     Segment a document into paragraphs, sentences, and tokens.
 
@@ -38,12 +510,49 @@ def process(document: str, bracket_skip_len=None) -> Iterator[Iterator[List[Toke
 
     :param document: to process
     :param bracket_skip_len: n. chars of bracketed text inside sentences to skip over
+    :param workers: number of processes to segment the paragraphs in (see `analyze`)
     :return: an iterator over paragraphs and sentences as lists of tokens
     """
-    tok = Tokenizer()
+    return _segmenter(bracket_skip_len).process(document, workers)
+
+
+def asegment(
+    chunks: AsyncIterable[Union[str, bytes]], bracket_skip_len=None, encoding: str = "utf-8"
+) -> AsyncIterator[List[Token]]:
+    """
+    Asynchronously segment a text arriving in chunks into sentences.
+
+    The sentences are generated as soon as their end is certain (see `SentenceSegmenter`),
+    with the offsets of the Tokens in the whole (decoded) text.
+    Large chunks are segmented in slices, giving control back to the event loop in between.
+
+    :param chunks: an async iterable over the text as `str` or encoded `bytes` chunks (not mixed)
+    :param bracket_skip_len: n. chars of bracketed text inside sentences to skip over
+    :param encoding: of the `bytes` chunks
+    :return: an async iterator over lists of Tokens,
+             with each list representing a sentence
+    :raise TypeError: if the chunks mix `str` and `bytes`
+    """
+    return _segmenter(bracket_skip_len).asegment(chunks, encoding=encoding)
 
-    for paragraph in preprocess(document):
-        yield segment(tok.tokenize(paragraph), bracket_skip_len)
+
+def aanalyze(
+    document: str, bracket_skip_len=None, executor: Optional["Executor"] = None
+) -> AsyncIterator[List[List[Token]]]:
+    """
+    Asynchronously analyze a document (see `analyze`), giving control back
+    to the event loop after every few thousand characters.
+
+    Given an executor (e.g., a `ProcessPoolExecutor`), the CPU-heavy segmentation
+    of the document is done in the executor while the event loop keeps running,
+    and only the Tokens are created in the event loop's thread.
+
+    :param document: to process
+    :param bracket_skip_len: n. chars of bracketed text inside sentences to skip over
+    :param executor: to segment the document in (optional)
+    :return: an async iterator over paragraphs as lists of sentences as lists of tokens
+    """
+    return _segmenter(bracket_skip_len).aanalyze(document, executor)
 
 
 def preprocess(text: str) -> List[str]:
@@ -54,7 +563,7 @@ def preprocess(text: str) -> List[str]:
     :param text: to preprocess
     :return: a list of paragraphs
     """
-    return __PARAGRAPH_SEP.split(
+    return _Patterns.paragraph_separator.split(
         Tokenizer.join_hyphenated_words_across_linebreaks(text)
     )
 
@@ -69,16 +578,70 @@ def preprocess_with_offsets(text: str) -> List[Tuple[int, str]]:
     :return: a list of (offset, paragraph) Tuples
     """
 
-    def finditer():
-        offset = 0
+    return [(start, text[start:end]) for start, end in paragraph_spans(text)]
+
+
+def paragraph_spans(text: str) -> Iterator[Tuple[int, int]]:
+    """
+    Generate the (start, end) offsets of the paragraphs in the text.
+
+    :param text: to split into paragraphs
+    :return: an iterator over (start, end) offset Tuples
+    """
+    offset = 0
+
+    for mo in _Patterns.paragraph_separator.finditer(text):
+        yield (offset, mo.start())
+        offset = mo.end()
+
+    yield (offset, len(text))
+
+
+def stream_paragraphs(chunks: Iterable[str]) -> Iterator[Tuple[int, str]]:
+    """
+    Split a stream of text chunks into (offset, paragraph) Tuples,
+    yielding each paragraph as soon as the chunks read so far make its end certain.
+
+    The paragraphs are the same as those of `preprocess_with_offsets`
+    on the joined chunks, but only the current paragraph is held in memory.
 
-        for mo in __PARAGRAPH_SEP.finditer(text):
-            yield (offset, text[offset:mo.start()])
-            offset = mo.end()
+    :param chunks: of the text to split, e.g., the lines of a file
+    :return: an iterator over (offset, paragraph) Tuples
+    """
+    buffer = ""
+    offset = 0  # of the buffer in the stream
+    scanned = 0  # position in the buffer up to where its separators were found
+
+    for chunk in chunks:
+        mo = _Patterns.last_non_space.search(chunk)
+
+        if mo is None:
+            buffer += chunk
+            continue
+
+        # a paragraph separator (only spacing) might continue into the next chunks,
+        # but not past the last non-space char
+        safe = len(buffer) + mo.end()
+        buffer += chunk
+        start = 0
+
+        for sep in _Patterns.paragraph_separator.finditer(buffer, scanned, safe):
+            yield offset + start, buffer[start:sep.start()]
+            start = sep.end()
+
+        if start:
+            buffer = buffer[start:]
+            offset += start
 
-        yield (offset, text[offset:])
+        scanned = safe - start
 
-    return list(finditer())
+    start = 0
+
+    for sep in _Patterns.paragraph_separator.finditer(buffer, scanned):
+        yield offset + start, buffer[start:sep.start()]
+        start = sep.end()
+
+    yield offset + start, buffer[start:]
 
 
 def split(tokens: Iterator[Token], bracket_skip_len=None) -> List[List[Token]]:
@@ -90,7 +653,7 @@ def split(tokens: Iterator[Token], bracket_skip_len=None) -> List[List[Token]]:
     :return: a list of Token lists,
              with each Token list representing a sentence
     """
-    return list(segment(tokens, bracket_skip_len))
+    return _segmenter(bracket_skip_len).split(tokens)
 
 
 def segment(tokens: Iterator[Token], bracket_skip_len=None) -> Iterator[List[Token]]:
@@ -102,30 +665,547 @@ def segment(tokens: Iterator[Token], bracket_skip_len=None) -> Iterator[List[Tok
     :return: an iterator over lists of Tokens,
              with each list representing a sentence
     """
-    if bracket_skip_len is not None:
-        State.max_bracket_skipping_length = int(bracket_skip_len)
+    return _segmenter(bracket_skip_len).segment(tokens)
 
-    for state in Begin(tokens):
-        if state.at_sentence:
-            history = state.collect_history()
 
-            if history and (len(history) > 1 or history[0].value):
-                yield history
+def segment_spans(tokens: Iterator[Token], bracket_skip_len=None) -> Iterator[Tuple[int, int]]:
+    """
+    Stream Token streams into sentence offsets, without collecting
+    the Tokens of each sentence.
 
+    :param tokens: the Token stream to segment
+    :param bracket_skip_len: n. chars of bracketed text inside sentences to skip over
+    :return: an iterator over the (start, end) offsets of the sentences,
+             from the offset of the first Token to the end of the last Token
+    """
+    return _segmenter(bracket_skip_len).segment_spans(tokens)
 
-if __name__ == "__main__":
-    import sys
 
-    def do(document: str) -> None:
-        for paragraph in process(document):
-            for sentence in paragraph:
-                print("".join(map(str, sentence)).lstrip())
+def sentence_spans(document: str, bracket_skip_len=None) -> Iterator[Tuple[int, int]]:
+    """
+    Segment a document into the (start, end) offsets of its sentences.
+
+    This produces the same sentences as `analyze`, but only their offsets,
+    which is faster and uses less memory than collecting their Tokens.
+
+    :param document: to process
+    :param bracket_skip_len: n. chars of bracketed text inside sentences to skip over
+    :return: an iterator over the (start, end) offsets of the sentences
+    """
+    return _segmenter(bracket_skip_len).sentence_spans(document)
+
+
+def segment_array(tokens: TokenArray, bracket_skip_len=None) -> Iterator[Tuple[int, int]]:
+    """
+    Stream the sentence boundaries in a columnar Token array.
+
+    :param tokens: the TokenArray to segment
+    :param bracket_skip_len: n. chars of bracketed text inside sentences to skip over
+    :return: an iterator over (start, end) index ranges into the TokenArray,
+             with each range representing a sentence
+    """
+    return _segmenter(bracket_skip_len).segment_array(tokens)
+
+
+def split_batch(
+    texts: Iterable[str], bracket_skip_len=None, tokenizer: Optional[Tokenizer] = None
+) -> Tuple[TokenBatch, array]:
+    """
+    Tokenize and split a batch of (many, short) texts into sentences in one go.
+
+    :param texts: to segment
+    :param bracket_skip_len: n. chars of bracketed text inside sentences to skip over
+    :param tokenizer: to tokenize the texts with (default: a `Tokenizer()`);
+                      reuse it for all batches, so its cache of chunk splits is reused, too
+    :return: the TokenBatch of the texts (see `Tokenizer.tokenize_batch`) and a flat array of
+             the (start, end) index range of each sentence in the TokenBatch, in order, so the
+             sentences of the i-th text are the ones in `boundaries[i]:boundaries[i + 1]`
+    """
+    return _segmenter(bracket_skip_len).split_batch(texts, tokenizer)
+
+
+def analyze_many(
+    documents: Iterable[str], bracket_skip_len=None, workers: Optional[int] = None, chunk_chars: int = 1 << 20
+) -> Iterator[Paragraphs]:
+    """
+    Analyze many documents in a pool of processes (see `analyze`).
+
+    The documents are sent to the processes in chunks of about `chunk_chars`
+    characters, so many short documents are segmented in one go while long
+    documents are segmented on their own. The processes only return the
+    offsets of the Tokens, which are turned back into Tokens of the documents.
+
+    :param documents: to process
+    :param bracket_skip_len: n. chars of bracketed text inside sentences to skip over
+    :param workers: number of processes (defaults to the number of CPUs; 1 means no pool)
+    :param chunk_chars: approx. number of characters to send to a process at a time
+    :return: an iterator over the documents (in input order) as lists
+             of paragraphs as lists of sentences as lists of Tokens
+    """
+    return _segmenter(bracket_skip_len).analyze_many(documents, workers, chunk_chars)
+
+
+def process_many(
+    documents: Iterable[str], bracket_skip_len=None, workers: Optional[int] = None, chunk_chars: int = 1 << 20
+) -> Iterator[Paragraphs]:
+    """
+    Process many documents in a pool of processes (see `process`).
+
+    The Tokens refer to the preprocessed paragraphs of each document,
+    just like the Tokens produced by `process`.
+
+    :param documents: to process
+    :param bracket_skip_len: n. chars of bracketed text inside sentences to skip over
+    :param workers: number of processes (defaults to the number of CPUs; 1 means no pool)
+    :param chunk_chars: approx. number of characters to send to a process at a time
+    :return: an iterator over the documents (in input order) as lists
+             of paragraphs as lists of sentences as lists of Tokens
+    """
+    return _segmenter(bracket_skip_len).process_many(documents, workers, chunk_chars)
+
+
+def sentence_spans_many(
+    documents: Iterable[str], bracket_skip_len=None, workers: Optional[int] = None, chunk_chars: int = 1 << 20
+) -> Iterator[List[Tuple[int, int]]]:
+    """
+    Segment many documents into sentence offsets in a pool of processes (see `sentence_spans`).
+
+    :param documents: to process
+    :param bracket_skip_len: n. chars of bracketed text inside sentences to skip over
+    :param workers: number of processes (defaults to the number of CPUs; 1 means no pool)
+    :param chunk_chars: approx. number of characters to send to a process at a time
+    :return: an iterator over the (start, end) offsets of the sentences in each document (in input order)
+    """
+    return _segmenter(bracket_skip_len).sentence_spans_many(documents, workers, chunk_chars)
+
+
+def analyze_table(
+    documents: Iterable[str], bracket_skip_len=None, workers: Optional[int] = None, chunk_chars: int = 1 << 20
+) -> OffsetTable:
+    """
+    Analyze many documents (see `analyze_many`) into one columnar table of their Tokens.
+
+    Instead of nested lists of Tokens, the table has the document number, paragraph and
+    sentence index, offsets, and value id of all Tokens in (flat) columns, ready to be
+    written out with `write_table`; in a pool of processes, the table is built directly
+    from the offsets the processes return, without creating any Tokens.
+
+    :param documents: to process
+    :param bracket_skip_len: n. chars of bracketed text inside sentences to skip over
+    :param workers: number of processes (defaults to the number of CPUs; 1 means no pool)
+    :param chunk_chars: approx. number of characters to send to a process at a time
+    :return: the OffsetTable of the Tokens of all documents, in input order
+    """
+    return _segmenter(bracket_skip_len).analyze_table(documents, workers, chunk_chars)
+
+
+def write_table(table: OffsetTable, path: str, table_format: Optional[str] = None) -> str:
+    """
+    Write an OffsetTable to a file in one go.
+
+    The Parquet and Arrow IPC formats require pyarrow; their `value` column is a dictionary
+    (categorical) column of the `values`. The "offsets" format needs no other package and is
+    read back with `read_table`.
+
+    :param table: to write
+    :param path: of the file to write
+    :param table_format: one of the `TABLE_FORMATS`; defaults to "parquet" if pyarrow is installed,
+                         and to "offsets" otherwise
+    :return: the format of the file written
+    :raise ValueError: if the format is unknown
+    :raise ImportError: if the format requires pyarrow, but it is not installed
+    """
+    if table_format is None:
+        try:
+            import pyarrow  # type: ignore # noqa: F401
+
+            table_format = "parquet"
+        except ImportError:
+            table_format = "offsets"
+
+    if table_format not in TABLE_FORMATS:
+        raise ValueError("unknown table format {}".format(table_format))
+
+    if table_format == "offsets":
+        _write_offsets(table, path)
+    else:
+        _write_arrow(table, path, table_format)
+
+    return table_format
+
+
+def read_table(path: str) -> OffsetTable:
+    """
+    Read an OffsetTable from a file in the "offsets" format of `write_table`.
+
+    The file holds a header (the magic bytes "SYNTOKT1", the number of rows, and the number of `values`),
+    the six integer columns, one after the other, then the end offset of each of the `values` in
+    the last part of the file, the UTF-8 encoded values themselves, all integers as little-endian int64s.
+
+    :param path: of the file to read
+    :return: the OffsetTable
+    :raise ValueError: if the file is not an offset table
+    """
+    with open(path, "rb") as handle:
+        data = handle.read()
+
+    if not data.startswith(_TABLE_MAGIC):
+        raise ValueError("{} is not an offset table".format(path))
+
+    def integers(first: int, count: int) -> array:
+        column = array("q")
+        column.frombytes(data[len(_TABLE_MAGIC) + first * 8:len(_TABLE_MAGIC) + (first + count) * 8])
+        return _little_endian(column)
+
+    rows, count = integers(0, 2)
+    document, paragraph, sentence, start, end, value = (integers(2 + column * rows, rows) for column in range(6))
+    ends = integers(2 + 6 * rows, count)
+    blob = data[len(_TABLE_MAGIC) + (2 + 6 * rows + count) * 8:]
+    values = [str(blob[first:last], "utf-8") for first, last in zip(chain((0,), ends), ends)]
+    return OffsetTable(document, paragraph, sentence, start, end, value, values)
+
+
+def _segmenter(bracket_skip_len) -> Segmenter:
+    """The Segmenter to use for the module-level functions."""
+    if bracket_skip_len is None:
+        return __DEFAULT_SEGMENTER
+
+    return Segmenter(SegmenterConfig.from_state(int(bracket_skip_len)))
+
+
+__DEFAULT_SEGMENTER = Segmenter()
+
+
+def _map_chunks(
+    function: Callable[[List[D], Segmenter], List[R]], documents: Iterable[D],
+    segmenter: Segmenter, workers: Optional[int], chunk_chars: int, size: Callable[[Any], int] = len
+) -> Iterator[Tuple[D, R]]:
+    """
+    Generate the documents with the results of `function(chunk, segmenter)`
+    over chunks of them, in input order, using a pool of `workers` processes.
+    """
+    if workers == 1:
+        for chunk in _chunks(documents, chunk_chars, size):
+            yield from zip(chunk, function(chunk, segmenter))
+
+        return
+
+    from concurrent.futures import ProcessPoolExecutor  # only imported if needed, as it takes a while
+
+    workers = workers or os.cpu_count() or 1
+
+    with ProcessPoolExecutor(workers) as pool:
+        # only keep a few chunks per process in flight, to bound the memory used
+        pending: Deque[Tuple[List[D], "Future"]] = deque()
+
+        for chunk in _chunks(documents, chunk_chars, size):
+            pending.append((chunk, pool.submit(function, chunk, segmenter)))
+
+            if len(pending) >= 2 * workers:
+                done, future = pending.popleft()
+                yield from zip(done, future.result())
+
+        while pending:
+            done, future = pending.popleft()
+            yield from zip(done, future.result())
+
+
+def _chunks(documents: Iterable[D], chunk_chars: int, size: Callable[[Any], int] = len) -> Iterator[List[D]]:
+    """Group the documents into chunks of about `chunk_chars` characters."""
+    chunk: List[D] = []
+    chars = 0
+
+    for document in documents:
+        chunk.append(document)
+        chars += size(document)
+
+        if chars >= chunk_chars:
+            yield chunk
+            chunk = []
+            chars = 0
+
+    if chunk:
+        yield chunk
+
+
+def _analyze_chunk(documents: List[str], segmenter: Segmenter) -> List[CompactParagraphs]:
+    tok = Tokenizer(replace_not_contraction=False)
+    return [
+        _compact(segmenter, tok, ((document, start, end) for start, end in paragraph_spans(document)))
+        for document in documents
+    ]
+
+
+def _process_chunk(documents: List[str], segmenter: Segmenter) -> List[CompactParagraphs]:
+    tok = Tokenizer()
+    return [
+        _compact(segmenter, tok, ((paragraph, 0, len(paragraph)) for paragraph in preprocess(document)))
+        for document in documents
+    ]
+
+
+def _analyze_paragraphs(paragraphs: List[Tuple[int, str]], segmenter: Segmenter) -> List[CompactParagraphs]:
+    tok = Tokenizer(replace_not_contraction=False)
+    return [_compact(segmenter, tok, [(text, 0, len(text))], offset) for offset, text in paragraphs]
+
+
+def _process_paragraphs(paragraphs: List[str], segmenter: Segmenter) -> List[CompactParagraphs]:
+    tok = Tokenizer()
+    return [_compact(segmenter, tok, [(text, 0, len(text))]) for text in paragraphs]
+
+
+def _size(paragraph: Tuple[int, str]) -> int:
+    return len(paragraph[1])
+
+
+def _paragraph_chunk_chars(document: str, workers: Optional[int]) -> int:
+    """Split a document into a few chunks per worker, but not into tiny ones."""
+    return max(1 << 16, len(document) // (4 * (workers or os.cpu_count() or 1)))
+
+
+class _SpanTokens(Iterator[Token]):
+    """
+    The Tokens of a text in a `TokenBatch`, created only when read, where the segmentation state machine
+    can skip the Tokens inside sentences that are neither terminals nor opening brackets (see `State`),
+    as no Tokens are needed for these to find the sentence spans.
+    """
+
+    __slots__ = ("_tokens", "_index", "_end", "_marked")
+
+    def __init__(self, tokens: TokenBatch, text: int, marked: array) -> None:
+        """
+        :param tokens: of the batch
+        :param text: the index of the text in the batch
+        :param marked: the (ascending) indices of the Tokens that might be terminals or opening brackets
+        """
+        self._tokens = tokens
+        self._index = tokens.boundaries[text]
+        self._end = tokens.boundaries[text + 1]
+        self._marked = marked
+
+    def __next__(self) -> Token:
+        index = self._index
+
+        if index == self._end:
+            raise StopIteration
+
+        self._index = index + 1
+        tokens = self._tokens  # as the Tokenizer does not replace "n't", the values are the text (see `TokenArray`)
+        return _SourceToken(tokens.text, tokens.spacing_starts[index], tokens.starts[index], tokens.ends[index])
+
+    def skip_words(self) -> None:
+        """Skip all but the last of the Tokens following the last one read that are neither terminals nor brackets."""
+        if self._index >= self._end:
+            return  # never move back to a Token that was read already
+
+        position = bisect_left(self._marked, self._index)
+        stop = min(self._marked[position] if position < len(self._marked) else self._end, self._end)
+
+        if self._index < stop - 1:
+            self._index = stop - 1
+
+
+def _marked(tokens: TokenArray) -> array:
+    """The (ascending) indices of the Tokens that contain a char of a terminal or opening bracket."""
+    starts = tokens.starts
+    marked = array("q")
+
+    for mo in _Patterns.terminal_or_bracket.finditer(tokens.text):
+        index = bisect_right(starts, mo.start()) - 1
+
+        if not marked or marked[-1] != index:
+            marked.append(index)
+
+    return marked
+
+
+def _sentence_spans_chunk(documents: List[str], segmenter: Segmenter) -> List[array]:
+    return [array("q", (i for span in segmenter.sentence_spans(d) for i in span)) for d in documents]
+
+
+def _compact(
+    segmenter: Segmenter, tok: Tokenizer, windows: Iterable[Tuple[str, int, int]], offset: int = 0
+) -> CompactParagraphs:
+    """Segment the paragraph windows into their compact (offset-only) form, shifting the offsets by `offset`."""
+    columns = TokenArray("")
+    sentences = array("q")
+    paragraphs = array("q")
+
+    for text, start, end in windows:
+        tokens = tok.split_array(text, start, end)
+        base = len(columns)
+
+        for first, last in segmenter.segment_array(tokens):
+            sentences.append(base + first)
+            sentences.append(base + last)
+
+        if offset:
+            columns.spacing_starts.extend(map(offset.__add__, tokens.spacing_starts))
+            columns.starts.extend(map(offset.__add__, tokens.starts))
+            columns.ends.extend(map(offset.__add__, tokens.ends))
+        else:
+            columns.spacing_starts.extend(tokens.spacing_starts)
+            columns.starts.extend(tokens.starts)
+            columns.ends.extend(tokens.ends)
+
+        columns.flags.extend(tokens.flags)
+        paragraphs.append(len(sentences) // 2)
+
+    return columns.spacing_starts, columns.starts, columns.ends, columns.flags, sentences, paragraphs
+
+
+def _expand(result: CompactParagraphs, texts: Callable[[int], List[str]]) -> Iterator[List[List[Token]]]:
+    """Turn a compact result back into paragraphs of sentences of Tokens of the `texts(num_paragraphs)`."""
+    spacing_starts, starts, ends, flags, sentences, paragraphs = result
+    first = 0
+
+    for text, last in zip(texts(len(paragraphs)), paragraphs):
+        tokens = TokenArray(text)
+        tokens.spacing_starts, tokens.starts, tokens.ends, tokens.flags = spacing_starts, starts, ends, flags
+        yield [[tokens[i] for i in range(sentences[2 * s], sentences[2 * s + 1])] for s in range(first, last)]
+        first = last
+
+
+def _file_paragraphs(data: Union[bytes, mmap.mmap], start: int, block_size: int) -> Iterator[Tuple[int, str]]:
+    """
+    Split the (UTF-8 encoded) `data` into (byte offset, paragraph) Tuples,
+    starting with (a part of) the paragraph just before the byte offset `start`.
+    """
+    begin = _last_non_space(data, start)
+    blocks: Deque[Tuple[int, Utf8Offsets]] = deque([(0, Utf8Offsets("", begin))])  # (char offset, offsets)
+
+    def texts() -> Iterator[str]:
+        char = 0
+
+        for first, last in _blocks(data, begin, block_size):
+            text = str(data[first:last], "utf-8")
+            blocks.append((char, Utf8Offsets(text, first)))
+            char += len(text)
+            yield text
+
+    for offset, paragraph in stream_paragraphs(texts()):
+        while len(blocks) > 1 and blocks[1][0] <= offset:
+            blocks.popleft()
+
+        char, offsets = blocks[0]
+        yield offsets(offset - char), paragraph
+
+
+def _last_non_space(data: Union[bytes, mmap.mmap], offset: int) -> int:
+    """
+    The byte offset of the last non-space char before the byte `offset` of the (UTF-8 encoded) `data`,
+    from where on the paragraph separators are the same as those found in all the data (or 0).
+    """
+    window = 1 << 12
+
+    while offset > 0:
+        first = max(0, offset - window)
+
+        while 0 < first < offset and 0x80 <= data[first] < 0xC0:
+            first += 1  # UTF-8 continuation byte
+
+        last = offset
+
+        while last < len(data) and 0x80 <= data[last] < 0xC0:
+            last += 1
+
+        text = str(data[first:last], "utf-8")
+        mo = _Patterns.last_non_space.search(text)
+
+        if mo is not None:
+            return first + len(text[:mo.start()].encode("utf-8"))
+        elif first == 0:
+            break
+
+        window *= 2
+
+    return 0
+
+
+def _byte_offsets(sentences: Iterable[List[Token]], offsets: Utf8Offsets) -> Iterator[List[Token]]:
+    """Set the offsets of the Tokens in the `sentences` to their byte offsets."""
+    for sentence in sentences:
+        deque(offsets.update(sentence), maxlen=0)
+        yield sentence
+
+
+class _Ids(Dict[str, int]):
+    """Assigns the next id to each new key."""
+
+    def __missing__(self, key: str) -> int:
+        self[key] = len(self)
+        return self[key]
+
+
+def _add_rows(
+    columns: List[List[int]], ids: _Ids, indices: Tuple[int, int, int], starts: List[int], values: List[str]
+) -> None:
+    """Add the rows of the Tokens of a sentence (at the document, paragraph, and sentence `indices`) to the `columns`."""
+    for column, index in zip(columns, indices):
+        column.extend(repeat(index, len(values)))
+
+    columns[3].extend(starts)
+    columns[4].extend(map(add, starts, map(len, values)))
+    columns[5].extend(map(ids.__getitem__, values))
+
+
+def _little_endian(column: array) -> array:
+    """The `column` with its items in little-endian byte order (a copy, on big-endian machines)."""
+    if sys.byteorder == "little":
+        return column
+
+    column = array(column.typecode, column)
+    column.byteswap()
+    return column
+
+
+def _write_offsets(table: OffsetTable, path: str) -> None:
+    """Write the `table` in the "offsets" format (see `read_table`)."""
+    blob = [value.encode("utf-8") for value in table.values]
+    header = array("q", [len(table.start), len(blob)])
+    ends = array("q", accumulate(map(len, blob)))
+
+    with open(path, "wb") as handle:
+        handle.write(_TABLE_MAGIC)
+
+        for column in chain([header], table[:6], [ends]):
+            handle.write(_little_endian(column).tobytes())
+
+        handle.write(b"".join(blob))
+
+
+def _write_arrow(table: OffsetTable, path: str, table_format: str) -> None:
+    """Write the `table` as an Arrow table to a Parquet or Arrow IPC file (with pyarrow)."""
+    import pyarrow  # type: ignore
+
+    def column(values: array) -> Any:
+        return pyarrow.Array.from_buffers(pyarrow.int64(), len(values), [None, pyarrow.py_buffer(values)])
+
+    columns = [column(values) for values in table[:5]]
+    columns.append(pyarrow.DictionaryArray.from_arrays(column(table.value), pyarrow.array(table.values, pyarrow.string())))
+    arrow = pyarrow.Table.from_arrays(columns, names=list(OffsetTable._fields[:6]))
+
+    if table_format == "parquet":
+        import pyarrow.parquet  # type: ignore
+
+        pyarrow.parquet.write_table(arrow, path)
+    else:
+        with pyarrow.OSFile(path, "wb") as sink, pyarrow.ipc.new_file(sink, arrow.schema) as writer:
+            writer.write_table(arrow)
+
+
+if __name__ == "__main__":
+    def do(lines: Iterable[str]) -> None:
+        for _, text in stream_paragraphs(lines):
+            for paragraph in process(text):
+                for sentence in paragraph:
+                    print("".join(map(str, sentence)).lstrip())
 
-            print("")
+                print("")
 
     for filename in sys.argv[1:]:
         with open(filename, "rt") as handle:
-            do(handle.read())
+            do(iter(lambda: handle.read(1 << 16), ""))
 
     if len(sys.argv) == 1:
-        do(sys.stdin.read())
+        do(sys.stdin)  # line by line, to segment interactive input as it comes in
@@ -1,6 +1,11 @@
+import asyncio
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from unittest import TestCase
 
 from syntok import segmenter
+from syntok._segmentation_states import State, Suspended, TokenStream
 from syntok.tokenizer import Token, Tokenizer
 
 DOCUMENT = """Lorem Ipsum
@@ -167,6 +172,20 @@ class TestSegmenter(TestCase):
         assert expected == received
         assert SEGMENTED_TOKENS == segmenter.split(TOKENIZER.tokenize(TEXT))
 
+    def test_segment_array(self):
+        tokens = TOKENIZER.split_array(TEXT)
+        result = [tokens.text[tokens.starts[i]:tokens.ends[j - 1]]
+                  for i, j in segmenter.segment_array(tokens)]
+        self.assertEqual(SENTENCES, result)
+
+    def test_split_batch(self):
+        texts = [TEXT, "", "  ", "Hi there. How are you?"]
+        tokens, spans = segmenter.split_batch(texts)
+        result = [tokens.text[tokens.starts[i]:tokens.ends[j - 1]] for i, j in zip(spans[::2], spans[1::2])]
+        self.assertEqual(SENTENCES + ["Hi there.", "How are you?"], result)
+        self.assertEqual(len(texts) + 1, len(tokens.boundaries))
+        self.assertEqual(tokens.boundaries[3], spans[-4])
+
     def test_simple(self):
         tokens = list(
             map(lambda v: Token("", v, 0), ["This", "is", "a", "sentence", "."])
@@ -511,6 +530,51 @@ class TestSegmenter(TestCase):
         self.assertEqual([tokens], result)
 
 
+class TestSegmenterConfig(TestCase):
+    TEXT = "This is one (Here is another view of the same. And then there is a different case here.)"
+
+    def test_bracket_skip_len_is_per_call(self):
+        tokens = Tokenizer().split(self.TEXT)
+        self.assertEqual(3, len(segmenter.split(iter(tokens))))
+        self.assertEqual(1, len(segmenter.split(iter(tokens), 100)))
+        self.assertEqual(70, State.max_bracket_skipping_length)
+        self.assertEqual(3, len(segmenter.split(iter(tokens))))
+
+    def test_bracket_skip_len_uses_altered_state(self):
+        tokens = Tokenizer().split("I met Foo. Bar and him.")
+        abbreviations = State.abbreviations
+
+        try:
+            State.abbreviations = abbreviations | {"Foo"}
+            self.assertEqual(1, len(segmenter.split(iter(tokens))))
+            self.assertEqual(1, len(segmenter.split(iter(tokens), 70)))
+        finally:
+            State.abbreviations = abbreviations
+
+        self.assertEqual(2, len(segmenter.split(iter(tokens), 70)))
+
+    def test_interleaved_segmenters(self):
+        tokens = Tokenizer().split(self.TEXT)
+        short = segmenter.Segmenter().segment(iter(tokens))
+        long = segmenter.Segmenter(segmenter.SegmenterConfig(max_bracket_skipping_length=100)).segment(iter(tokens))
+        self.assertEqual(3, len(next(short)))
+        self.assertEqual(len(tokens), len(next(long)))
+        self.assertEqual(2, len(list(short)))
+        self.assertEqual([], list(long))
+
+    def test_abbreviations(self):
+        config = segmenter.SegmenterConfig(abbreviations=State.abbreviations | {"Abc"})
+        tokens = Tokenizer().split("This is Abc. Tom's part.")
+        self.assertEqual(2, len(segmenter.split(iter(tokens))))
+        self.assertEqual(1, len(segmenter.Segmenter(config).split(iter(tokens))))
+
+    def test_starters(self):
+        config = segmenter.SegmenterConfig(starters=frozenset())
+        tokens = Tokenizer().split("This is Dr. The End.")
+        self.assertEqual(2, len(segmenter.split(iter(tokens))))
+        self.assertEqual(1, len(segmenter.Segmenter(config).split(iter(tokens))))
+
+
 class TestPreprocess(TestCase):
     def test_preprocess_with_offsets(self):
         text = " ab\n\u00a0 \n cd- \n ef \n\n g \n \n"
@@ -537,6 +601,373 @@ class TestAnalyze(TestCase):
                         self.assertEqual(offset, token.offset, repr(token))
                         offset += len(token.value)
 
+    def test_analyze_bytes(self):
+        document = "Grüße aus Köln. Don't panic 😀!\n\n«Ça va?» Oui, ça va."
+        data = document.encode("utf-8")
+
+        for source in (data, memoryview(data)):
+            result = [[[(t.value, t.offset) for t in s] for s in p] for p in segmenter.analyze(source)]
+            expected = [[[(t.value, len(document[:t.offset].encode("utf-8"))) for t in s] for s in p]
+                        for p in segmenter.analyze(document)]
+            self.assertListEqual(expected, result)
+            self.assertEqual(2, len(result[0]))
+            self.assertEqual((".", data.index(b".")), result[0][0][-1])
+
+    def test_analyze_file(self):
+        brackets = "Das ist gut (Über " + "öäü " * 10 + "noch was.) und dann.\n\n"
+        data = ("Grüße aus Köln. Don't panic 😀!\n\n«Ça va?» Oui, ça va.\n \n\n" + brackets + DOCUMENT).encode("utf-8")
+
+        def values(paragraphs):
+            return [[[(t.value, t.offset) for t in s] for s in p] for p in paragraphs]
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "file.txt")
+
+            with open(path, "wb") as handle:
+                handle.write(data)
+
+            expected = values(segmenter.analyze(data))
+            self.assertListEqual(expected, values(segmenter.analyze_file(path)))
+            self.assertEqual(1, len(expected[2]))
+            regions = [0, 5, 40, 41, 300, None]
+            result = [p for start, end in zip(regions, regions[1:]) for p in segmenter.analyze_file(path, start=start, end=end)]
+            self.assertListEqual(expected, values(result))
+            self.assertListEqual(expected[:1], values(segmenter.analyze_file(path, end=1)))
+
+
+class TestSentenceSpans(TestCase):
+    def test_sentence_spans(self):
+        expected = []
+
+        for paragraph in segmenter.analyze(DOCUMENT):
+            for sentence in paragraph:
+                last = [t for t in sentence if t.value][-1]
+                expected.append((sentence[0].offset, last.offset + len(last.value)))
+
+        self.assertListEqual(expected, list(segmenter.sentence_spans(DOCUMENT)))
+
+    def test_sentence_spans_of_text(self):
+        result = [TEXT[start:end] for start, end in segmenter.sentence_spans(TEXT)]
+        self.assertListEqual(SENTENCES, result)
+
+    def test_sentence_spans_skip_words(self):
+        tokens = Tokenizer(replace_not_contraction=False).tokenize_batch(["Lorem Ipsum", "A b, c d (e). F g h"])
+        marked = segmenter._marked(tokens)
+
+        def read(text):
+            stream = segmenter._SpanTokens(tokens, text, marked)
+            values = []
+
+            for token in stream:
+                values.append(token.value)
+                stream.skip_words()
+
+            return values
+
+        self.assertListEqual(["Lorem", "Ipsum"], read(0))
+        self.assertListEqual(["A", "d", "(", ")", ".", "h"], read(1))
+
+    def test_segment_spans(self):
+        tokens = Tokenizer().tokenize("  This is a sentence. And another one!  ")
+        result = list(segmenter.segment_spans(tokens))
+        self.assertListEqual([(2, 21), (22, 38)], result)
+
+    def test_paragraph_spans(self):
+        text = " ab\n\u00a0 \n cd- \n ef \n\n g \n \n"
+        result = list(segmenter.paragraph_spans(text))
+        self.assertListEqual([(0, 3), (7, 17), (19, 22), (25, 25)], result)
+
+
+class TestStreamParagraphs(TestCase):
+    def test_stream_paragraphs(self):
+        text = "One.\n\nTwo\nlines.\r\n \r\n\nThree.\n \n"
+
+        for size in range(1, len(text) + 1):
+            chunks = [text[i:i + size] for i in range(0, len(text), size)]
+            self.assertListEqual(segmenter.preprocess_with_offsets(text), list(segmenter.stream_paragraphs(chunks)))
+
+    def test_stream_paragraphs_of_lines(self):
+        self.assertListEqual(
+            segmenter.preprocess_with_offsets(DOCUMENT),
+            list(segmenter.stream_paragraphs(DOCUMENT.splitlines(keepends=True)))
+        )
+
+    def test_stream_paragraphs_without_chunks(self):
+        self.assertListEqual([(0, "")], list(segmenter.stream_paragraphs([])))
+
+
+class TestSentenceSegmenter(TestCase):
+    @staticmethod
+    def segmented(sentences):
+        return [[repr(t) for t in sentence] for sentence in sentences]
+
+    def test_feed(self):
+        expected = self.segmented(segmenter.segment(Tokenizer().tokenize(OSPL)))
+
+        for size in (1, 7, 100, len(OSPL)):
+            incremental = segmenter.SentenceSegmenter()
+            result = []
+
+            for i in range(0, len(OSPL), size):
+                result.extend(incremental.feed(OSPL[i:i + size]))
+
+            result.extend(incremental.flush())
+            self.assertListEqual(expected, self.segmented(result), size)
+
+    def test_feed_returns_certain_sentences(self):
+        incremental = segmenter.SentenceSegmenter()
+        self.assertListEqual([], incremental.feed("This is one. And"))
+        self.assertListEqual([["This", "is", "one", "."]], [[t.value for t in s] for s in incremental.feed(" an")])
+        self.assertListEqual([], incremental.feed("other (one. Or not.)"))
+        sentences = incremental.flush()
+        self.assertListEqual([["And", "another", "(", "one", ".", "Or", "not", ".", ")"]],
+                             [[t.value for t in s] for s in sentences])
+        self.assertEqual(13, sentences[0][0].offset)
+
+    def test_feed_resumes_the_machine(self):
+        incremental = segmenter.SentenceSegmenter()
+        incremental.feed("One sentence without")
+        machine = incremental._machine
+
+        for _ in range(1000):
+            self.assertListEqual([], incremental.feed(" any end"))
+
+        self.assertIs(machine, incremental._machine)
+        self.assertLessEqual(len(incremental._stream.tokens), 2)
+        sentences = incremental.feed(". Next ")
+        self.assertEqual(2004, len(sentences[0]))
+        self.assertEqual(".", sentences[0][-1].value)
+
+    def test_token_stream(self):
+        stream = TokenStream()
+        self.assertFalse(stream.pending)
+        self.assertRaises(Suspended, next, stream)
+        stream.extend(Tokenizer().tokenize("a b"))
+        self.assertEqual("a", next(stream).value)
+        stream.extend(Tokenizer().tokenize("c"))
+        self.assertListEqual(["b", "c"], [next(stream).value, next(stream).value])
+        self.assertRaises(Suspended, next, stream)
+        stream.close()
+        self.assertTrue(stream.pending)
+        self.assertIsNone(next(stream, None))
+
+    def test_flush_resets(self):
+        incremental = segmenter.SentenceSegmenter()
+        incremental.feed("One. Two.")
+        incremental.flush()
+        incremental.feed("Three. ")
+        self.assertListEqual([[0, 5]], [[t.offset for t in s] for s in incremental.flush()])
+
+
+class TestAsync(TestCase):
+    @staticmethod
+    def run_async(agen):
+        async def collect():
+            return [item async for item in agen]
+
+        loop = asyncio.new_event_loop()
+
+        try:
+            return loop.run_until_complete(collect())
+        finally:
+            loop.close()
+
+    @staticmethod
+    async def chunks(items):
+        for item in items:
+            yield item
+
+    def test_asegment(self):
+        chunks = [OSPL[i:i + 50] for i in range(0, len(OSPL), 50)]
+        self.assertListEqual(
+            TestSentenceSegmenter.segmented(segmenter.segment(Tokenizer().tokenize(OSPL))),
+            TestSentenceSegmenter.segmented(self.run_async(segmenter.asegment(self.chunks(chunks))))
+        )
+
+    def test_asegment_bytes(self):
+        text = "Die Straße ist naß. Ein Über-Satz."
+        data = text.encode("utf-8")
+        chunks = [data[i:i + 3] for i in range(0, len(data), 3)]
+        sentences = self.run_async(segmenter.asegment(self.chunks(chunks)))
+        self.assertListEqual(["Die Straße ist naß.", " Ein Über-Satz."], [Tokenizer.to_text(s) for s in sentences])
+        self.assertEqual(text.index("Ein"), sentences[1][0].offset)
+
+    def test_asegment_mixed_chunks(self):
+        self.assertRaises(TypeError, self.run_async, segmenter.asegment(self.chunks(["Die ", "Straße".encode("utf-8")])))
+        self.assertRaises(TypeError, self.run_async, segmenter.asegment(self.chunks([b"Die Stra\xc3", "\x9fe"])))
+
+    def test_asegment_without_sentence_ends(self):
+        text = "and on " * 4999 + "and on"
+        chunks = [text[i:i + 50] for i in range(0, len(text), 50)]
+        sentences = self.run_async(segmenter.asegment(self.chunks(chunks)))
+        self.assertEqual(1, len(sentences))
+        self.assertEqual(10000, len(sentences[0]))
+
+    def test_asegment_yields_to_the_loop(self):
+        ticks = []
+
+        async def tick():
+            while True:
+                ticks.append(None)
+                await asyncio.sleep(0)
+
+        async def segment():
+            ticker = asyncio.ensure_future(tick())
+            agen = segmenter.Segmenter().asegment(self.chunks([OSPL]), slice_chars=100)
+            sentences = [sentence async for sentence in agen]
+            ticker.cancel()
+            return sentences
+
+        loop = asyncio.new_event_loop()
+
+        try:
+            loop.run_until_complete(segment())
+        finally:
+            loop.close()
+
+        self.assertGreater(len(ticks), len(OSPL) // 100 // 2)
+
+    def test_aanalyze(self):
+        expected = TestMany.expected(segmenter.analyze, DOCUMENT)
+        self.assertListEqual(expected, TestMany.expected(lambda d: self.run_async(segmenter.aanalyze(d)), DOCUMENT))
+
+        with ThreadPoolExecutor(1) as executor:
+            self.assertListEqual(
+                expected, TestMany.expected(lambda d: self.run_async(segmenter.aanalyze(d, executor=executor)), DOCUMENT)
+            )
+
+
+class TestInstrumentation(TestCase):
+    def test_instrumentation(self):
+        instrumentation = segmenter.Instrumentation()
+        instrumented = segmenter.Segmenter(instrumentation=instrumentation)
+        tokens = list(Tokenizer().tokenize("This is Mr. Smith. He said (what? No.) hi. And the end"))
+        self.assertListEqual(
+            [[repr(t) for t in s] for s in segmenter.segment(iter(tokens))],
+            [[repr(t) for t in s] for s in instrumented.segment(iter(tokens))]
+        )
+        stats = instrumentation.as_dict()
+        self.assertListEqual(list(State.rules), list(stats["rules"]))
+        self.assertEqual(1, stats["rules"]["abbreviation"])
+        self.assertEqual(2, stats["splits"])
+        self.assertEqual(sum(stats["rules"].values()), sum(stats["look_ahead"].values()))
+        self.assertEqual(instrumentation.bracket_searches, sum(stats["bracket_look_ahead"].values()))
+        self.assertGreater(stats["bracket_searches"], 0)
+        self.assertGreater(stats["bracket_seconds"], 0)
+
+    def test_no_instrumentation(self):
+        self.assertIsNone(segmenter.Segmenter().instrumentation)
+
+
+class TestMany(TestCase):
+    DOCUMENTS = [DOCUMENT, "", TEXT, "Don't (stop). Now\n\nthe end"]
+
+    @staticmethod
+    def expected(function, document):
+        return [[[repr(t) for t in sentence] for sentence in paragraph] for paragraph in function(document)]
+
+    def assertSegmented(self, function, results):
+        self.assertListEqual(
+            [self.expected(function, d) for d in self.DOCUMENTS],
+            [self.expected(lambda x: x, r) for r in results]
+        )
+
+    def test_analyze_many(self):
+        self.assertSegmented(segmenter.analyze, segmenter.analyze_many(self.DOCUMENTS, workers=1, chunk_chars=100))
+
+    def test_analyze_many_in_processes(self):
+        self.assertSegmented(segmenter.analyze, segmenter.analyze_many(self.DOCUMENTS, workers=2, chunk_chars=100))
+
+    def test_process_many(self):
+        self.assertSegmented(segmenter.process, segmenter.process_many(self.DOCUMENTS, workers=2))
+
+    def test_sentence_spans_many(self):
+        self.assertListEqual(
+            [list(segmenter.sentence_spans(d, 10)) for d in self.DOCUMENTS],
+            list(segmenter.sentence_spans_many(self.DOCUMENTS, 10, workers=2))
+        )
+
+    def test_analyze_paragraphs_in_processes(self):
+        document = "\n\n".join(self.DOCUMENTS * 3)
+        self.assertListEqual(
+            self.expected(segmenter.analyze, document),
+            self.expected(lambda d: segmenter.analyze(d, workers=2), document)
+        )
+
+    def test_process_paragraphs_in_processes(self):
+        document = "\n\n".join(self.DOCUMENTS * 3)
+        self.assertListEqual(
+            self.expected(segmenter.process, document),
+            self.expected(lambda d: segmenter.process(d, workers=2), document)
+        )
+
+
+class TestTable(TestCase):
+    DOCUMENTS = TestMany.DOCUMENTS + ["Zwei Straße.  \n\n Straße!"]
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "table")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def expected(self):
+        return [
+            (number, p, s, token.offset, token.offset + len(token.value), token.value)
+            for number, document in enumerate(self.DOCUMENTS)
+            for p, paragraph in enumerate(segmenter.analyze(document))
+            for s, sentence in enumerate(paragraph)
+            for token in sentence
+        ]
+
+    @staticmethod
+    def rows(table):
+        return [row[:5] + (table.values[row[5]],) for row in zip(*table[:6])]
+
+    def test_analyze_table(self):
+        table = segmenter.analyze_table(self.DOCUMENTS, workers=1)
+        self.assertListEqual(self.expected(), self.rows(table))
+        self.assertEqual(len(table.values), len(set(table.values)))
+        self.assertEqual(1, table.values.count("Straße"))
+
+    def test_analyze_table_in_processes(self):
+        self.assertListEqual(self.expected(), self.rows(segmenter.analyze_table(self.DOCUMENTS, workers=2)))
+
+    def test_offsets_format(self):
+        table = segmenter.analyze_table(self.DOCUMENTS, workers=1)
+        self.assertEqual("offsets", segmenter.write_table(table, self.path, "offsets"))
+        self.assertEqual(table, segmenter.read_table(self.path))
+
+    def test_arrow_formats(self):
+        try:
+            import pyarrow.parquet  # type: ignore
+        except ImportError:
+            self.skipTest("pyarrow is not installed")
+
+        table = segmenter.analyze_table(self.DOCUMENTS, workers=1)
+        self.assertEqual("parquet", segmenter.write_table(table, self.path))
+        self.assertListEqual(list(table.start), pyarrow.parquet.read_table(self.path).column("start").to_pylist())
+        segmenter.write_table(table, self.path, "arrow")
+        arrow = pyarrow.ipc.open_file(self.path).read_all()
+        self.assertListEqual([t[3:] for t in self.expected()], list(zip(
+            arrow.column("start").to_pylist(), arrow.column("end").to_pylist(), arrow.column("value").to_pylist()
+        )))
+
+    def test_empty_table(self):
+        table = segmenter.analyze_table([], workers=1)
+        segmenter.write_table(table, self.path, "offsets")
+        self.assertEqual(table, segmenter.read_table(self.path))
+
+    def test_table_errors(self):
+        table = segmenter.analyze_table([], workers=1)
+        self.assertRaises(ValueError, segmenter.write_table, table, self.path, "csv")
+
+        with open(self.path, "wb") as handle:
+            handle.write(b"PAR1")
+
+        self.assertRaises(ValueError, segmenter.read_table, self.path)
+
 
 class TestProcess(TestCase):
     def test_process(self):
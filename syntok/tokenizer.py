@@ -1,6 +1,93 @@
-from typing import Iterator, List, Generator
+import json
+import mmap
+import os
+from array import array
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from itertools import accumulate, chain
+from typing import (
+    TYPE_CHECKING, Any, Callable, Deque, Dict, Iterable, Iterator, List, Generator, Optional, Tuple, TypeVar, Union, cast
+)
 
-import regex
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+T = TypeVar("T")
+
+BytesLike = Union[bytes, bytearray, memoryview]
+"""UTF-8 encoded text (or any other object supporting the buffer protocol, such as a `mmap.mmap`)."""
+
+Split = Tuple[Tuple[int, int, int, Optional[str]], ...]
+"""The (spacing start, start, end, value) of each Token in a chunk, relative to the chunk (see `ChunkCache`)."""
+
+
+class _LazyPattern:
+    """
+    A regex pattern (as class attribute) that is only compiled when first used,
+    so importing syntok neither compiles any patterns nor imports the `regex` module.
+
+    Once compiled, the pattern replaces this descriptor in its class,
+    so using it is just as fast as using a pattern compiled at import.
+
+    The pattern is compiled with one of the `BACKENDS`: the `regex` module, for its
+    Unicode properties and reverse matching, or the standard library's `re` module,
+    which matches simple patterns faster (and is imported with Python anyway).
+    """
+
+    __slots__ = ("pattern", "reverse", "backend", "_owner", "_name")
+
+    BACKENDS = ("regex", "re")
+    """The modules to compile patterns with."""
+
+    instances: List["_LazyPattern"] = []
+    """All lazy patterns defined so far (see `compile_patterns`)."""
+
+    def __init__(self, pattern: str, reverse: bool = False, backend: str = "regex") -> None:
+        """
+        :param pattern: the regular expression (for the `backend` module)
+        :param reverse: to match the pattern in reverse (`regex.REVERSE`; requires the `regex` backend)
+        :param backend: one of the `BACKENDS`
+        """
+        assert backend in _LazyPattern.BACKENDS and not (reverse and backend == "re")
+        self.pattern = pattern
+        self.reverse = reverse
+        self.backend = backend
+        _LazyPattern.instances.append(self)
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self._owner = owner
+        self._name = name
+
+    def __get__(self, instance: Any, owner: type) -> Any:
+        return self.compile()
+
+    def compile(self) -> Any:
+        """Compile the pattern, and replace this descriptor with it (if it is still in place)."""
+        if self.backend == "re":
+            import re
+
+            compiled = re.compile(self.pattern)
+        else:
+            import regex
+
+            compiled = regex.compile(self.pattern, regex.REVERSE if self.reverse else 0)
+
+        if self._owner.__dict__.get(self._name) is self:
+            setattr(self._owner, self._name, compiled)
+
+        return compiled
+
+
+def compile_patterns() -> None:
+    """
+    Compile all (lazy) regex patterns of the modules of syntok imported so far.
+
+    Call this to move the cost of compiling them out of the first use:
+    e.g., before forking worker processes, so they share the compiled patterns.
+    """
+    for pattern in _LazyPattern.instances:
+        if pattern._owner.__dict__.get(pattern._name) is pattern:
+            pattern.compile()
 
 
 class Token:
@@ -18,41 +105,56 @@ class Token:
 
     Two Tokens are equal if they share the same value,
     no matter their spacing and offsets.
+
+    Tokens produced by the `Tokenizer` only keep a reference to the
+    text they were found in and the positions of their spacing and value;
+    the `spacing` and `value` strings are materialized when first read.
     """
 
+    __slots__ = ("_source", "_start", "_spacing_len", "_value_len", "_offset", "_value")
+
     def __init__(self, space_prefix: str, value: str, offset: int) -> None:
-        self._spacing = space_prefix
-        self._value = value
+        self._source = space_prefix
+        self._start = self._spacing_len = len(space_prefix)
+        self._value_len = 0
         self._offset = offset
+        self._value = value  # type: Optional[str]
 
     def __repr__(self) -> str:
         return "<Token %s : %s @ %d>" % (
-            repr(self._spacing),
-            repr(self._value),
+            repr(self.spacing),
+            repr(self.value),
             self._offset
         )
 
     def __str__(self) -> str:
-        return "%s%s" % (self._spacing, self._value)
+        return "%s%s" % (self.spacing, self.value)
 
     def __eq__(self, other) -> bool:
         if other is None or not isinstance(other, Token):
             return False
 
-        return other._value == self._value
+        return other.value == self.value
 
     def __hash__(self) -> int:
-        return hash(self._value)
+        return hash(self.value)
+
+    def __reduce__(self):
+        # do not pickle the whole source text with every Token
+        return Token, (self.spacing, self.value, self._offset)
 
     @property
     def value(self) -> str:
         """The Token's actual value."""
+        if self._value is None:
+            self._value = self._source[self._start:self._start + self._value_len]
+
         return self._value
 
     @property
     def spacing(self) -> str:
         """The spacing that prefixed the Token in the text."""
-        return self._spacing
+        return self._source[self._start - self._spacing_len:self._start]
 
     @property
     def offset(self) -> int:
@@ -64,6 +166,285 @@ class Token:
         self._offset += val
 
 
+class _SourceToken(Token):
+    """
+    A Token referring to its spacing `source[spacing_start:start]`
+    and value `source[start:end]` in the text it was found in.
+
+    The `value` can be set explicitly, if it differs from the text.
+    """
+
+    __slots__ = ()
+
+    def __init__(
+        self, source: str, spacing_start: int, start: int, end: int, value: Optional[str] = None
+    ) -> None:
+        # only store the (usually small, and therefore cached) lengths, not more int objects
+        self._source = source
+        self._start = self._offset = start
+        self._spacing_len = start - spacing_start
+        self._value_len = end - start
+        self._value = value
+
+
+class TokenArray:
+    """
+    A columnar sequence of the Tokens found in a text.
+
+    Instead of Token objects, only the positions of the Tokens in the `text`
+    are stored, in the array columns `spacing_starts`, `starts`, and `ends`,
+    together with a `flags` column for Tokens whose value differs from the text.
+    Tokens are only created when they are accessed by index or iterated over.
+    """
+
+    NOT_CONTRACTION = 1
+    """Flag for Tokens with the value "not" in place of the "n't" in the text."""
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.spacing_starts = array("q")
+        self.starts = array("q")
+        self.ends = array("q")
+        self.flags = array("b")
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: int) -> Token:
+        return _SourceToken(
+            self.text, self.spacing_starts[index], self.starts[index], self.ends[index],
+            "not" if self.flags[index] & TokenArray.NOT_CONTRACTION else None
+        )
+
+    def __iter__(self) -> Iterator[Token]:
+        text = self.text
+
+        for spacing_start, start, end, flags in zip(self.spacing_starts, self.starts, self.ends, self.flags):
+            yield _SourceToken(text, spacing_start, start, end, "not" if flags & TokenArray.NOT_CONTRACTION else None)
+
+    def append(self, text: str, spacing_start: int, start: int, end: int, value: Optional[str] = None) -> None:
+        """Add the Token with the spacing `text[spacing_start:start]` and value `text[start:end]` (or `value`)."""
+        self.spacing_starts.append(spacing_start)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.flags.append(0 if value is None else TokenArray.NOT_CONTRACTION)
+
+    def value(self, index: int) -> str:
+        """The value of the Token at `index`."""
+        if self.flags[index] & TokenArray.NOT_CONTRACTION:
+            return "not"
+
+        return self.text[self.starts[index]:self.ends[index]]
+
+    def spacing(self, index: int) -> str:
+        """The spacing prefix of the Token at `index`."""
+        return self.text[self.spacing_starts[index]:self.starts[index]]
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """
+        Expose the columns as NumPy arrays (without copying them).
+
+        This requires NumPy to be installed.
+        """
+        import numpy  # type: ignore
+
+        return {
+            "spacing_starts": numpy.frombuffer(self.spacing_starts, dtype=numpy.int64),
+            "starts": numpy.frombuffer(self.starts, dtype=numpy.int64),
+            "ends": numpy.frombuffer(self.ends, dtype=numpy.int64),
+            "flags": numpy.frombuffer(self.flags, dtype=numpy.int8),
+        }
+
+
+class TokenBatch(TokenArray):
+    """
+    The Tokens of a batch of texts, in one columnar `TokenArray` (see `Tokenizer.tokenize_batch`).
+
+    The `text` of the array is the texts joined by the `SEPARATOR`;
+    the Tokens of the i-th text are the ones at the indices in the range
+    `boundaries[i]:boundaries[i + 1]`, and it starts at `offsets[i]` in the `text`.
+    """
+
+    SEPARATOR = "\n0\n"
+    """Joins the texts: the "0" between spacing chars is always a Token of its own (that separates the texts)."""
+
+    def __init__(self, texts: Iterable[str]) -> None:
+        texts = texts if isinstance(texts, list) else list(texts)
+        super().__init__(TokenBatch.SEPARATOR.join(texts))
+        separator = len(TokenBatch.SEPARATOR)
+        offsets = array("q", accumulate(chain((0,), (len(text) + separator for text in texts))))
+        offsets.pop()  # the start of the text after the last one
+        self.offsets = offsets
+        """The start of each text in the `text`."""
+        self.boundaries = array("q", [0])
+        """The index of the first Token of each text (and one more, after the last Token)."""
+        self._separators = (offset - separator + 1 for offset in self.offsets[1:])
+        self._start = 0
+        self._next = next(self._separators, -1)
+
+    def size(self, index: int) -> int:
+        """The number of Tokens of the text at `index` in the batch."""
+        return self.boundaries[index + 1] - self.boundaries[index]
+
+    def tokens(self, index: int) -> List[Token]:
+        """The Tokens of the text at `index` in the batch, with their offsets in that text."""
+        offset = self.offsets[index]
+        tokens = [self[i] for i in range(self.boundaries[index], self.boundaries[index + 1])]
+
+        for token in tokens:
+            token.update(-offset)
+
+        return tokens
+
+    def values(self, index: int) -> List[str]:
+        """The values of the Tokens of the text at `index` in the batch."""
+        return [self.value(i) for i in range(self.boundaries[index], self.boundaries[index + 1])]
+
+    def _add(self, text: str, spacing_start: int, start: int, end: int, value: Optional[str] = None) -> None:
+        """
+        Add a Token of the current text (see `append`), or end the current text at the Token separating it
+        from the next one, adding its trailing spacing Token, if any: the spacing of the separator
+        is shared with the end of the current text, and the spacing after it with the start of the next one.
+        """
+        if spacing_start < self._start:
+            spacing_start = self._start
+
+        if start != self._next:
+            self.spacing_starts.append(spacing_start)
+            self.starts.append(start)
+            self.ends.append(end)
+            self.flags.append(0 if value is None else TokenArray.NOT_CONTRACTION)
+        else:
+            if spacing_start < start - 1:
+                self.append(text, spacing_start, start - 1, start - 1)
+
+            self.boundaries.append(len(self.starts))
+            self._start = end + 1
+            self._next = next(self._separators, -1)
+
+
+class Utf8Offsets:
+    """
+    Convert the (char) offsets of a text to the offsets of the same positions
+    in its UTF-8 encoding, incrementally: Each conversion only encodes the text
+    between the previous and the current offset, so converting ascending offsets
+    (e.g., of a Token stream) takes time linear in the length of the text.
+    """
+
+    __slots__ = ("text", "base", "ascii", "_char", "_byte")
+
+    _non_ascii = _LazyPattern(r"[^\x00-\x7f]", backend="re")
+
+    def __init__(self, text: str, base: int = 0) -> None:
+        self.text = text
+        """The text whose offsets to convert."""
+        self.base = base
+        """The byte offset of the text itself (e.g., in a file), to add to all its byte offsets."""
+        self.ascii = Utf8Offsets._non_ascii.search(text) is None
+        """If the text is ASCII, and therefore its byte and char offsets are the same."""
+        self._char = 0
+        self._byte = base
+
+    def __call__(self, offset: int) -> int:
+        """The byte offset of the char `offset` in the text."""
+        if self.ascii:
+            return self.base + offset
+
+        if offset >= self._char:
+            self._byte += len(self.text[self._char:offset].encode("utf-8"))
+        else:
+            self._byte -= len(self.text[offset:self._char].encode("utf-8"))
+
+        self._char = offset
+        return self._byte
+
+    def update(self, tokens: Iterable[Token]) -> Iterator[Token]:
+        """Set the offsets of the `tokens` (found in the text) to their byte offsets."""
+        if self.ascii and not self.base:
+            yield from tokens
+        else:
+            for token in tokens:
+                token.update(self(token.offset) - token.offset)
+                yield token
+
+
+class ChunkCache:
+    """
+    A size-bounded cache of the splits of the chunks (whitespace-delimited strings)
+    that are not simple words, such as "U.S.", "(see", or "don't", evicting the
+    least recently used split when full, with the statistics of its lookups.
+
+    The splits store the Token positions relative to the chunk (see `Split`),
+    so that the Tokens of a chunk can be rebuilt wherever the chunk appears,
+    and a spacing start of -1 refers to the spacing before the chunk.
+    """
+
+    __slots__ = ("maxsize", "hits", "misses", "evictions", "_splits")
+
+    def __init__(self, maxsize: int) -> None:
+        """
+        :param maxsize: the maximum number of chunk splits to keep (at least 1)
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1, not {}".format(maxsize))
+
+        self.maxsize = maxsize
+        """Maximum number of chunk splits to keep."""
+        self.hits = 0
+        """Number of chunks whose split was found in the cache."""
+        self.misses = 0
+        """Number of chunks whose split was not found in the cache."""
+        self.evictions = 0
+        """Number of chunk splits removed from the cache to keep it within its `maxsize`."""
+        self._splits: Dict[str, Split] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._splits)
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of lookups that found the split in the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, chunk: str) -> Optional[Split]:
+        """The split of the `chunk`, if cached, marking it as the most recently used one."""
+        # pop and re-insert instead of move_to_end, so another thread's eviction cannot get in the way
+        split = self._splits.pop(chunk, None)
+
+        if split is None:
+            self.misses += 1
+        else:
+            self._splits[chunk] = split
+            self.hits += 1
+
+        return split
+
+    def put(self, chunk: str, split: Split) -> None:
+        """Cache the `split` of the `chunk`, evicting the least recently used split if full."""
+        self._splits[chunk] = split
+
+        while len(self._splits) > self.maxsize:
+            self._splits.popitem(last=False)  # type: ignore
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all splits and reset the statistics."""
+        self._splits.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Export the statistics as a (JSON-serializable) dictionary."""
+        return {
+            "size": len(self._splits),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
+
+
 class Tokenizer:
     # noinspection PyUnresolvedReferences
     """ Split strings into syntactic Tokens. """
@@ -74,17 +455,17 @@ class Tokenizer:
     _hyphens_and_underscore = frozenset(_hyphens + "_")
     """The set of all hyphen Unicode chars and the underscore."""
 
-    _hyphen_newline = regex.compile(r"(?<=\p{L})[" + _hyphens + "][ \t\u00a0\r]*\n[ \t\u00a0]*(?=\\p{L})")
+    _hyphen_newline = _LazyPattern(r"(?<=\p{L})[" + _hyphens + "][ \t\u00a0\r]*\n[ \t\u00a0]*(?=\\p{L})")
     """A token split across a newline with a hyphen marker."""
 
     _apostrophes = "'\u00B4\u02B9\u02BC\u2019\u2032"
     """Apostrophe Unicode chars to be aware of when splitting."""
 
-    _apostrophe_t = regex.compile('[' + _apostrophes + ']t')
+    _apostrophe_t = _LazyPattern('[' + _apostrophes + ']t', backend="re")
     """Apostrophe-t regex, to detect "n't" suffixes."""
 
-    # about 25% of the runtime of the tokenizer is spent with this regex
-    _separation = regex.compile(
+    # only used on words that are not simple (see `_chunks`), as it is expensive
+    _separation = _LazyPattern(
         r"(?<=\p{Ll})[.!?]?(?=\p{Lu})|" +  # lowercase-uppercase transitions
         r"[" + _apostrophes + r"]\p{L}+|" +  # apostrophes and their tail
         r"[\p{Ps}\p{Pe}]|" +   # parenthesis and open/close punctuation
@@ -95,8 +476,67 @@ class Tokenizer:
     """Secondary regex to sub-split non-whitespace sequences."""
 
     # Annoyingly, unicode regex character class \S does not include the zwsp...
-    _spaces = regex.compile(r"[^\s\u200b]+", regex.UNICODE)
-    """Primary regex to split strings at any kind of Unicode whitespace and the zero width space (zwsp)."""
+    _chunks = _LazyPattern(
+        r"(?=[^\s\u200b])[^\s\u200b\p{L}\p{N}]*" +  # any non-alnum prefix of a whitespace-delimited chunk
+        r"(?:((?:(?![" + _apostrophes + r"])[\p{L}\p{N}](?!(?<=\p{Ll})\p{Lu}))+)" +  # 1: simple word, ...
+        r"(?=[^\s\u200b\p{L}\p{N}]*(?![^\s\u200b]))|" +  # ... followed by no other alnum in the chunk
+        r"([\p{L}\p{N}](?:[^\s\u200b]*[\p{L}\p{N}])?))?" +  # 2: or any other alnum word
+        r"[^\s\u200b]*"  # and any (non-alnum) suffix
+    )
+    """
+    Primary regex to split strings at any kind of Unicode whitespace and the zero width space (zwsp),
+    that at the same time finds the alnum word inside each chunk, if any: group 1 matches simple words
+    that cannot contain any `_separation` patterns, and group 2 any other words.
+    """
+
+    # the patterns for plain (ASCII) text only have to match ASCII chars: \p{L} is [A-Za-z], \p{N} is [0-9], etc.,
+    # so they are matched with the (faster) `re` module; they must only be used on plain text (see `_not_plain`)
+    _ascii_space = r"\t\n\x0b\x0c\r "
+    """The ASCII chars of `\\s` (for character classes)."""
+
+    _ascii_separation = _LazyPattern(
+        r"(?<=[a-z])[.!?]?(?=[A-Z])|'[A-Za-z]+|[(\[{)\]}]|\.\.\.|" +
+        r"(?<=[A-Za-z])[,;_-](?=[A-Za-z0-9])|(?<=[A-Za-z0-9])[,;_-](?=[A-Za-z])",
+        backend="re"
+    )
+    """`_separation` for plain text."""
+
+    _ascii_chunks = _LazyPattern(
+        r"(?=[^" + _ascii_space + r"])[^" + _ascii_space + r"A-Za-z0-9]*" +
+        r"(?:((?:[A-Za-z0-9](?!(?<=[a-z])[A-Z]))+)" +
+        r"(?=[^" + _ascii_space + r"A-Za-z0-9]*(?![^" + _ascii_space + r"]))|" +
+        r"([A-Za-z0-9](?:[^" + _ascii_space + r"]*[A-Za-z0-9])?))?" +
+        r"[^" + _ascii_space + r"]*",
+        backend="re"
+    )
+    """`_chunks` for plain text."""
+
+    _spacing = _LazyPattern(r"[\t\n\x0b\x0c\r \x85\xa0\u1680\u2000-\u200b\u2028\u2029\u202f\u205f\u3000]", backend="re")
+    """
+    Any char that separates chunks, to find the block boundaries (see `_block_size`): the same chars as
+    `[\\s\\u200b]` in `regex` (whose `\\s` are the Unicode White_Space chars), but matched faster by `re`.
+    """
+
+    _not_plain = _LazyPattern(r"[^\x00-\x1b\x20-\x7f]", backend="re")
+    """
+    Any char that is not (plain) ASCII, or that `str.split` but not `_chunks` considers whitespace,
+    to detect blocks that can be split into chunks without `_chunks` (see `_scan_plain`).
+    """
+
+    _trailing_spacing = _LazyPattern(r"[\s\u200b]*", reverse=True)
+    """The spacing at the end of a text (by matching it in reverse)."""
+
+    _odd_spacing = _LazyPattern(r"[\x1c-\x1f\u200b]", backend="re")
+    """The chars that either `str.split` or `_chunks` (but not both) consider spacing."""
+
+    _block_size = 1 << 7
+    """The minimum number of chars to scan as one block (of either plain or other text)."""
+
+    _max_block_size = 1 << 14
+    """The maximum number of chars to scan as one block, after a series of blocks that were not plain."""
+
+    _batch_cache_size = 1 << 12
+    """The max. number of chunk splits to cache for the batches of a Tokenizer without a `cache`."""
 
     @staticmethod
     def join_hyphenated_words_across_linebreaks(text: str) -> str:
@@ -113,7 +553,8 @@ class Tokenizer:
         return "".join(map(str, tokens))
 
     def __init__(
-        self, emit_hyphen_or_underscore_sep: bool = False, replace_not_contraction: bool = True
+        self, emit_hyphen_or_underscore_sep: bool = False, replace_not_contraction: bool = True,
+        cache_size: int = 0
     ):
         """
         Set tuning options around hyphens & underscores, and "n't" contractions.
@@ -124,117 +565,394 @@ class Tokenizer:
         :param emit_hyphen_or_underscore_sep: as separate tokens
                                               if found as single char inside words
         :param replace_not_contraction: replace "n't" with "not" (by default)
+        :param cache_size: the maximum number of chunk splits to cache
+                           (see `ChunkCache`; by default, nothing is cached)
         """
         self.emit_hyphen_underscore_sep = emit_hyphen_or_underscore_sep
         self.replace_not_contraction = replace_not_contraction
+        self.cache = ChunkCache(cache_size) if cache_size > 0 else None
+        self._batch_cache: Optional[ChunkCache] = None
 
-    def split(self, text: str) -> List[Token]:
-        """Extract the list of Tokens from `text`."""
+    def split(self, text: Union[str, BytesLike]) -> List[Token]:
+        """Extract the list of Tokens from `text` (see `tokenize`)."""
         return list(self.tokenize(text))
 
-    def tokenize(self, text: str, base_offset: int = 0) -> Iterator[Token]:
-        """Generate Tokens from the `text`."""
+    def split_array(self, text: str, start: int = 0, end: Optional[int] = None) -> TokenArray:
+        """
+        Extract the Tokens from `text` into a columnar `TokenArray`.
+
+        :param text: to tokenize
+        :param start: of the window to tokenize (see `tokenize_window`)
+        :param end: of the window to tokenize (see `tokenize_window`)
+        :return: the TokenArray of the text
+        """
+        tokens = TokenArray(text)
+        deque(self._scan(text, start, len(text) if end is None else end, tokens.append), maxlen=0)
+        return tokens
+
+    def tokenize_batch(self, texts: Iterable[str]) -> TokenBatch:
+        """
+        Extract the Tokens from a batch of (many, short) texts into one columnar `TokenBatch`.
+
+        The Tokens of each text are the same as the ones `tokenize` would generate,
+        but the batch is tokenized in one go, saving the overhead of each call,
+        and the Tokens are only created when accessed.
+
+        :param texts: to tokenize
+        :return: the TokenBatch of the texts
+        """
+        tokens = TokenBatch(texts)
+        self._scan_batch(tokens)
+
+        if tokens.offsets:
+            tokens.boundaries.append(len(tokens))
+
+        return tokens
+
+    def tokenize(self, text: Union[str, BytesLike], base_offset: int = 0) -> Iterator[Token]:
+        """
+        Generate Tokens from the `text`.
+
+        If the text is bytes-like (see `BytesLike`), it is decoded from UTF-8
+        (without copying it first), and the Token offsets are byte offsets.
+
+        :param text: to tokenize
+        :param base_offset: to add to the offset of each Token
+        :return: an iterator over the Tokens in the text
+        """
+        if isinstance(text, str):
+            tokens = self.tokenize_window(text)
+        else:
+            text = str(text, "utf-8")
+            tokens = Utf8Offsets(text).update(self.tokenize_window(text))
+
         if base_offset > 0:
-            text = " " * base_offset + text
+            return Tokenizer._shift(tokens, base_offset)
+
+        return tokens
+
+    def tokenize_file(self, path: str, block_size: int = 1 << 20) -> Iterator[Token]:
+        """
+        Generate the Tokens of the UTF-8 encoded file at `path`, with their byte offsets.
+
+        The file is memory-mapped and decoded in blocks of about `block_size` bytes,
+        so the OS pages the file in as needed and only the Tokens' blocks are held in memory.
+        The Tokens are the same as those of `tokenize` on the whole file's content.
+
+        :param path: of the file to tokenize
+        :param block_size: approx. number of bytes to decode and tokenize at a time
+        :return: an iterator over the Tokens in the file
+        """
+        with _mapped(path) as data:
+            rest = ""  # the spacing at the end of the last block, to prefix the next Token with
+            offset = 0  # of the rest in the file
+
+            for start, end in _blocks(data, 0, block_size):
+                text = rest + str(data[start:end], "utf-8")
+                cut = Tokenizer._trailing_spacing.match(text).start()
+                offsets = Utf8Offsets(text, offset)
+                yield from offsets.update(self.tokenize_window(text, 0, cut))
+                rest = text[cut:]
+                offset = offsets(cut)
+
+            yield from Utf8Offsets(rest, offset).update(self.tokenize_window(rest))
+
+    def tokenize_window(self, text: str, start: int = 0, end: Optional[int] = None) -> Iterator[Token]:
+        """
+        Generate Tokens from the window `text[start:end]` without copying it.
+
+        The Token offsets are positions in the whole `text`, so a document
+        can be tokenized paragraph by paragraph while preserving the
+        offsets of each Token in the document.
+
+        :param text: containing the window to tokenize
+        :param start: of the window (inclusive)
+        :param end: of the window (exclusive; defaults to the end of the text)
+        :return: an iterator over the Tokens in the window
+        """
+        return self._scan(text, start, len(text) if end is None else end, _SourceToken)
 
-        offset = base_offset
+    def _scan(self, text: str, start: int, end: int, make: Callable[..., T]) -> Iterator[T]:
+        """
+        Generate whatever `make(text, spacing_start, start, end[, value])`
+        returns for each Token found in the window `text[start:end]`.
+
+        The window is scanned in blocks that end at spacing chars,
+        so each block can take the fast path if it is plain text;
+        the blocks grow while the text is not plain, as in most non-English text.
+        """
+        spacing = start
+        size = Tokenizer._block_size
 
-        for mo in Tokenizer._spaces.finditer(text):
-            start = Tokenizer._find_start(mo.start(), mo.end(), text)
+        while start < end:
+            stop = start + size
 
-            if start == mo.end():
-                yield Token(text[offset:mo.start()], mo.group(0), mo.start())
+            if stop < end:
+                mo = Tokenizer._spacing.search(text, stop, end)
+                stop = end if mo is None else mo.start()
             else:
-                end = Tokenizer._find_end(start, mo.end(), text)
+                stop = end
 
-                if start > mo.start():
-                    offset = yield from self._split_nonword_prefix(mo, offset, start, text)
+            if Tokenizer._not_plain.search(text, start, stop) is None:
+                spacing = yield from self._scan_plain(text, spacing, start, stop, make)
+                size = Tokenizer._block_size
+            else:
+                spacing = yield from self._scan_chunks(text, spacing, start, stop, make)
+                size = min(4 * size, Tokenizer._max_block_size)
 
-                if start != end:
-                    yield from self._split_word(text[offset:start], text[start:end], start)
+            start = stop
 
-                tail = text[end:mo.end()]
+        if spacing < end:
+            yield make(text, spacing, end, end)
 
-                if tail.startswith("..."):
-                    yield Token("", "...", end)
-                    end += 3
-                    tail = tail[3:]
+    def _scan_plain(
+            self, text: str, spacing: int, start: int, end: int, make: Callable[..., T]
+    ) -> Generator[T, None, int]:
+        """
+        Fast path of `_scan_chunks` for blocks of plain ASCII text (see `_not_plain`):
+        The block is split into chunks with `str.split` and simple words
+        are produced without matching `_chunks`, while any other chunk
+        is left to `_scan_chunks`; returns the start of the next spacing.
+        """
+        find = text.find
 
-                yield from [Token("", c, idx + end) for idx, c in enumerate(tail)]
+        for chunk in text[start:end].split():
+            begin = find(chunk, spacing)
+            stop = begin + len(chunk)
 
-            offset = mo.end()
+            # an ASCII word is simple if it does not contain any lowercase-uppercase transitions
+            if chunk.isalnum() and (chunk.islower() or chunk.istitle() or chunk.isupper() or chunk.isdigit()):
+                yield make(text, spacing, begin, stop)
+            elif self.cache is None:
+                yield from self._scan_chunks(text, spacing, begin, stop, make)
+            else:
+                yield from self._replay(self._scan_chunks, chunk, text, spacing, begin, stop, make)
 
-        if offset < len(text):
-            yield Token(text[offset:], "", len(text))
+            spacing = stop
 
-    @staticmethod
-    def _find_start(start: int, end: int, text: str) -> int:
-        for c in range(start, end):
-            if text[c].isalnum():
-                break
+        return spacing
+
+    def _scan_batch(self, tokens: TokenBatch) -> None:
+        """
+        `_scan` the text of a `TokenBatch` into its columns, in blocks of a fixed size:
+        The blocks are split into chunks with `str.split` (unless they contain `_odd_spacing`),
+        and in plain blocks, the simple words are added to the columns directly, while
+        the splits of any other chunks are cached, as the same chunks recur in the texts
+        (for all batches, if the Tokenizer has no `cache`); separators end the current text.
+        """
+        if self.cache is None and self._batch_cache is None:
+            self._batch_cache = ChunkCache(Tokenizer._batch_cache_size)
+
+        cache = cast(ChunkCache, self._batch_cache if self.cache is None else self.cache)
+        text, add = tokens.text, tokens._add
+        add_spacing_start, add_start, add_end, add_flags = (
+            tokens.spacing_starts.append, tokens.starts.append, tokens.ends.append, tokens.flags.append
+        )
+        add_boundary, separators = tokens.boundaries.append, tokens._separators
+        find = text.find
+        sink: Deque[None] = deque(maxlen=0)
+        consume = sink.extend
+        start = spacing = 0
+        end = len(text)
+
+        while start < end:
+            stop = start + Tokenizer._block_size
+
+            if stop < end:
+                mo = Tokenizer._spacing.search(text, stop, end)
+                stop = end if mo is None else mo.start()
+            else:
+                stop = end
+
+            mo = Tokenizer._not_plain.search(text, start, stop)
+            plain = mo is None
+
+            if plain or Tokenizer._odd_spacing.search(text, mo.start(), stop) is None:
+                separator = tokens._next
+
+                for chunk in text[start:stop].split():
+                    begin = find(chunk, spacing)
+                    last = begin + len(chunk)
+
+                    if begin == separator:  # the same as `add(text, spacing, begin, last)`, but inlined
+                        if spacing < begin - 1:
+                            add_spacing_start(spacing)
+                            add_start(begin - 1)
+                            add_end(begin - 1)
+                            add_flags(0)
+
+                        add_boundary(len(tokens.starts))
+                        last += 1
+                        tokens._start = last
+                        separator = tokens._next = next(separators, -1)
+                    elif plain and chunk.isalnum() and (
+                            chunk.islower() or chunk.istitle() or chunk.isupper() or chunk.isdigit()
+                    ):
+                        add_spacing_start(spacing)
+                        add_start(begin)
+                        add_end(last)
+                        add_flags(0)
+                    else:
+                        split = cache.get(chunk)
+
+                        if split is None:
+                            split = Tokenizer._record(self._scan_chunks, chunk, text, begin, last, cache)
+
+                        for spacing_start, first, final, value in split:  # the same as `_replay`, but inlined
+                            add_spacing_start(spacing if spacing_start < 0 else begin + spacing_start)
+                            add_start(begin + first)
+                            add_end(begin + final)
+                            add_flags(0 if value is None else TokenArray.NOT_CONTRACTION)
+
+                    spacing = last
+            else:
+                consume(self._scan_chunks(text, spacing, start, stop, add))
+                # the next spacing starts after the last Token or separator in the block
+                spacing = max(tokens.ends[-1] if tokens.ends else 0, tokens._start)
+
+            start = stop
+
+        spacing = max(spacing, tokens._start)
+
+        if spacing < end:
+            add(text, spacing, end, end)
+
+    def _scan_chunks(
+            self, text: str, spacing: int, start: int, end: int, make: Callable[..., T]
+    ) -> Generator[T, None, int]:
+        """
+        Produce the Tokens of each chunk in the block `text[start:end]`
+        found with `_chunks`; returns the start of the next spacing.
+        """
+        chunks = Tokenizer._ascii_chunks if Tokenizer._is_plain(text, start, end) else Tokenizer._chunks
+
+        for mo in chunks.finditer(text, start, end):
+            (begin, stop), (first, last), word = mo.regs
+            simple = first != -1
+
+            if not simple:
+                first, last = word
+
+            if first == -1:
+                yield make(text, spacing, begin, stop)
+            else:
+                if first > begin:
+                    spacing = yield from Tokenizer._split_nonword_prefix(text, spacing, begin, first, make)
+
+                if simple:
+                    yield make(text, spacing, first, last)
+                elif self.cache is None:
+                    yield from self._split_word(text, spacing, first, last, make)
+                else:
+                    yield from self._replay(self._split_word, text[first:last], text, spacing, first, last, make)
+
+                if last < stop:
+                    if text.startswith("...", last, stop):
+                        yield make(text, last, last, last + 3)
+                        last += 3
+
+                    for idx in range(last, stop):
+                        yield make(text, idx, idx, idx + 1)
+
+            spacing = stop
+
+        return spacing
 
-            start += 1
+    def _replay(
+            self, scan: Callable[..., Iterator[Any]], chunk: str,
+            text: str, spacing: int, start: int, end: int, make: Callable[..., T]
+    ) -> Iterator[T]:
+        """
+        Produce the Tokens of the `chunk` at `text[start:end]` from its cached split;
+        if it is not cached yet, `scan(text, spacing, start, end, make)` splits it.
+        """
+        cache = cast(ChunkCache, self.cache)
+        split = cache.get(chunk)
 
-        return start
+        if split is None:
+            split = Tokenizer._record(scan, chunk, text, start, end, cache)
+
+        for spacing_start, first, last, value in split:
+            yield make(text, spacing if spacing_start < 0 else start + spacing_start, start + first, start + last, value)
 
     @staticmethod
-    def _find_end(start: int, end: int, text: str) -> int:
-        for c in range(end - 1, start - 1, -1):
-            if text[c].isalnum():
-                break
+    def _record(
+            scan: Callable[..., Iterator[Any]], chunk: str, text: str, start: int, end: int, cache: ChunkCache
+    ) -> Split:
+        """Split the `chunk` at `text[start:end]` with `scan` and cache its split (see `_replay`)."""
+        def relative(_: str, spacing_start: int, first: int, last: int, value: Optional[str] = None):
+            return spacing_start - start if spacing_start >= 0 else -1, first - start, last - start, value
 
-            end -= 1
+        split = tuple(scan(text, -1, start, end, relative))
+        cache.put(chunk, split)
+        return split
 
-        return end
+    @staticmethod
+    def _is_plain(text: str, start: int, end: int) -> bool:
+        """If `text[start:end]` (and the char before it, which lookbehinds can see) is plain text (see `_not_plain`)."""
+        return Tokenizer._not_plain.search(text, start - 1 if start else 0, end) is None
+
+    @staticmethod
+    def _shift(tokens: Iterator[Token], base_offset: int) -> Iterator[Token]:
+        """Add `base_offset` to the offset of each Token."""
+        for token in tokens:
+            token.update(base_offset)
+            yield token
 
     @staticmethod
-    def _split_nonword_prefix(mo, offset: int, start: int, text: str) -> Generator[Token, None, int]:
+    def _split_nonword_prefix(
+            text: str, spacing: int, start: int, end: int, make: Callable[..., T]
+    ) -> Generator[T, None, int]:
         """Yield separate tokens for each non-alnum symbol prefixing an alnum word."""
-        for i, c in enumerate(text[mo.start():start]):
-            if i == 0:
-                yield Token(text[offset:mo.start()], c, mo.start())
-                offset = start
-            else:
-                yield Token("", c, mo.start() + i)
+        yield make(text, spacing, start, start + 1)
 
-        return offset
+        for idx in range(start + 1, end):
+            yield make(text, idx, idx, idx + 1)
 
-    def _split_word(self, prefix: str, word: str, offset: int) -> Iterator[Token]:
+        return end
+
+    def _split_word(self, text: str, spacing: int, start: int, end: int, make: Callable[..., T]) -> Iterator[T]:
         """Yield separate tokens alnum words if they contain `_separation` patterns."""
-        remainder = 0
+        remainder = start
+        separation = Tokenizer._ascii_separation if Tokenizer._is_plain(text, start, end) else Tokenizer._separation
 
-        for mo in Tokenizer._separation.finditer(word):
-            prefix = yield from self._produce_separator_split_token(remainder, word, mo, prefix, offset)
+        for mo in separation.finditer(text, start, end):
+            spacing = yield from self._produce_separator_split_token(
+                text, spacing, remainder, mo.start(), mo.end(), make
+            )
             remainder = mo.end()
 
-        if remainder == 0:
-            yield Token(prefix, word, offset)
-        elif remainder < len(word):
-            yield Token(prefix, word[remainder:], offset + remainder)
+        if remainder < end:
+            yield make(text, spacing, remainder, end)
 
     def _produce_separator_split_token(
-            self, remainder: int, word: str, mo: regex, prefix: str, offset: int
-    ) -> Generator[Token, None, str]:
-        """Helper method to handle alnum words with `_separation` patterns."""
-        if mo.start() > remainder:
-            if Tokenizer._apostrophe_t.fullmatch(mo.group(0)) and word[mo.start() - 1] == 'n':
-                if remainder < mo.start() - 1:
-                    yield Token(prefix, word[remainder:mo.start() - 1], offset + remainder)
-                    prefix = ""
-
-                yield Token(prefix, "not" if self.replace_not_contraction else 'n' + mo.group(0), offset + mo.start() - 1)
-                return ""
-
-            yield Token(prefix, word[remainder:mo.start()], offset + remainder)
-            prefix = ""
-
-        separator = mo.group(0)
-
-        if separator and self._can_emit(separator):
-            yield Token(prefix, separator, offset + mo.start())
-            return ""
+            self, text: str, spacing: int, remainder: int, start: int, end: int, make: Callable[..., T]
+    ) -> Generator[T, None, int]:
+        """
+        Helper method to handle alnum words with `_separation` patterns
+        between `start` and `end`; returns the start of the next spacing.
+        """
+        if start > remainder:
+            if text[start - 1] == 'n' and Tokenizer._apostrophe_t.fullmatch(text, start, end):
+                if remainder < start - 1:
+                    yield make(text, spacing, remainder, start - 1)
+                    spacing = start - 1
+
+                if self.replace_not_contraction:
+                    yield make(text, spacing, start - 1, end, "not")
+                else:
+                    yield make(text, spacing, start - 1, end)
+
+                return end
+
+            yield make(text, spacing, remainder, start)
+            spacing = start
+
+        if start < end and self._can_emit(text[start:end]):
+            yield make(text, spacing, start, end)
+            return end
         else:
-            return prefix + separator
+            return spacing
 
     def _can_emit(self, separator: str):
         """Verify if the alnum word `separator` can be emitted with this Tokenizer."""
@@ -242,16 +960,163 @@ class Tokenizer:
                separator not in Tokenizer._hyphens_and_underscore
 
 
+@contextmanager
+def _mapped(path: str) -> Iterator[Union[bytes, mmap.mmap]]:
+    """Memory-map the file at `path` for reading (if it is not empty)."""
+    with open(path, "rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            yield b""  # empty files cannot be mapped
+        else:
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                yield data
+
+
+def _blocks(data: Union[bytes, mmap.mmap], start: int, size: int) -> Iterator[Tuple[int, int]]:
+    """
+    Generate the (start, end) offsets of consecutive blocks of (UTF-8 encoded) `data` from `start` on,
+    of about `size` bytes each, ending after a newline, so each block can be decoded on its own.
+    """
+    length = len(data)
+
+    while start < length:
+        end = data.find(b"\n", start + size) + 1 or length
+        yield start, end
+        start = end
+
+
+FORMATS = ("text", "jsonl", "tsv")
+"""
+The output formats of the command line tokenizer, for each input line:
+"text" (the Token values, space-separated), "jsonl" (a JSON array of the Tokens,
+as objects of their value, offset, and spacing), or "tsv" (one row of the line number,
+start and end offsets, and value of each Token); the offsets are char offsets in the line,
+and the "jsonl" and "tsv" formats do not tokenize the line breaks.
+"""
+
+_LINE_TOKENIZER = Tokenizer()
+"""The Tokenizer of the command line (per process), reused for all chunks to reuse its cached splits."""
+
+
+def _format_lines(lines: List[str], output_format: str, number: int = 1) -> str:
+    """Tokenize a chunk of `lines` as a batch and format the Tokens (see `FORMATS`), numbering the lines from `number`."""
+    if output_format == "text":
+        tokens = _LINE_TOKENIZER.tokenize_batch(lines)
+        return "".join(" ".join(tokens.values(index)) + "\n" for index in range(len(lines)))
+
+    tokens = _LINE_TOKENIZER.tokenize_batch([line.rstrip("\r\n") for line in lines])
+    text, spacing_starts, starts, ends, boundaries = (
+        tokens.text, tokens.spacing_starts, tokens.starts, tokens.ends, tokens.boundaries
+    )
+    output = []
+
+    for index, offset in enumerate(tokens.offsets):
+        first, last = boundaries[index], boundaries[index + 1]
+
+        if output_format == "jsonl":
+            output.append(json.dumps([
+                {"value": tokens.value(i), "offset": starts[i] - offset, "spacing": text[spacing_starts[i]:starts[i]]}
+                for i in range(first, last)
+            ], ensure_ascii=False) + "\n")
+        else:
+            output.extend(
+                "%d\t%d\t%d\t%s\n" % (number + index, starts[i] - offset, ends[i] - offset, tokens.value(i))
+                for i in range(first, last)
+            )
+
+    return "".join(output)
+
+
+def _imap(function: Callable[[Any], T], chunks: Iterable[Any], workers: Optional[int]) -> Iterator[T]:
+    """Generate `function(chunk)` for each chunk, in input order, using a pool of `workers` processes."""
+    if workers == 1:
+        yield from map(function, chunks)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor  # only imported if needed, as it takes a while
+
+    workers = workers or os.cpu_count() or 1
+
+    with ProcessPoolExecutor(workers) as pool:
+        # only keep a few chunks per process in flight, to bound the memory used
+        pending: Deque["Future"] = deque()
+
+        for chunk in chunks:
+            pending.append(pool.submit(function, chunk))
+
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+
+def _line_chunks(streams: Iterable[Iterable[str]], size: int) -> Iterator[Tuple[List[str], int]]:
+    """Group the lines of the `streams` into chunks of `size` lines, with the number of the first line of each."""
+    number = 1
+
+    for stream in streams:
+        chunk: List[str] = []
+
+        for line in stream:
+            chunk.append(line)
+
+            if len(chunk) == size:
+                yield chunk, number
+                number += size
+                chunk = []
+
+        if chunk:
+            yield chunk, number
+            number += len(chunk)
+
+
+def _format_chunk(output_format: str, chunk: Tuple[List[str], int]) -> str:
+    """`_format_lines` of a chunk from `_line_chunks`."""
+    return _format_lines(chunk[0], output_format, chunk[1])
+
+
 if __name__ == '__main__':
+    import argparse
     import sys
+    from functools import partial
 
-    tok = Tokenizer()
+    parser = argparse.ArgumentParser(
+        prog="python3 -m syntok.tokenizer", description="Tokenize each line of plain-text files (or STDIN)."
+    )
+    parser.add_argument("files", nargs="*", help="to tokenize (default: STDIN)")
+    parser.add_argument(
+        "-f", "--format", choices=FORMATS, default="text",
+        help="of the Tokens of each line: space-separated values (text), a JSON array of value/offset/spacing objects "
+             "(jsonl), or rows of line number, start, end, and value (tsv; lines are counted over all files)"
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1, help="number of worker processes (0: one per CPU); the lines stay in order"
+    )
+    parser.add_argument(
+        "--chunk-lines", type=int, default=1 << 13, help="number of lines to tokenize and write at a time"
+    )
+    args = parser.parse_args()
 
-    if len(sys.argv) > 1:
-        for filename in sys.argv[1:]:
+    def streams() -> Iterator[Iterable[str]]:
+        for filename in args.files:
             with open(filename, 'rt') as stream:
-                for line in stream:
-                    print(" ".join(t.value for t in tok.tokenize(line)))
-    else:
-        for line in sys.stdin:
-            print(" ".join(t.value for t in tok.tokenize(line)))
+                yield stream
+
+        if not args.files:
+            yield sys.stdin
+
+    interactive = not args.files and sys.stdin.isatty()  # tokenize each line as it comes in
+    chunks = _line_chunks(streams(), 1 if interactive else args.chunk_lines)
+
+    try:
+        for output in _imap(partial(_format_chunk, args.format), chunks, args.jobs or None):
+            sys.stdout.write(output)
+
+            if interactive:
+                sys.stdout.flush()
+
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # e.g., piped into head: redirect stdout, as Python flushes it again at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
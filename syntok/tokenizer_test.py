@@ -1,8 +1,16 @@
+import json
 import os
+import pickle
+import re
+import subprocess
+import sys
+import tempfile
+from functools import partial
 from typing import List, Iterable
-from unittest import TestCase
+from unittest import TestCase, mock
 
-from syntok.tokenizer import Tokenizer, Token
+from syntok import tokenizer as module
+from syntok.tokenizer import ChunkCache, Tokenizer, Token, TokenArray, TokenBatch, Utf8Offsets
 
 
 def s(tokens: Iterable[Token]) -> List[str]:
@@ -54,6 +62,26 @@ class TestTokenizer(TestCase):
         for h in Tokenizer._hyphens:
             self.assertListEqual(s(self.tokenizer.split("ab" + h + "cd")), ["ab", h, "cd"])
 
+    def test_chunks(self):
+        chunks = [(mo.group(), mo.group(1), mo.group(2)) for mo in Tokenizer._chunks.finditer("(hello), camelCase \u200b... don't x2")]
+        self.assertListEqual([
+            ("(hello),", "hello", None), ("camelCase", None, "camelCase"), ("...", None, None),
+            ("don't", None, "don't"), ("x2", "x2", None)
+        ], chunks)
+
+    def test_plain_and_other_blocks(self):
+        plain = "Hello camelCase world, don't (see U.S.) McDonald x2Y 1,000.00 x-ray... "
+        values = ["Hello", "camel", "Case", "world", ",", "do", "n't", "(", "see", "U.S", ".", ")",
+                  "Mc", "Donald", "x2Y", "1,000.00", "x", "ray", "..."]
+        self.tokenizer = Tokenizer(replace_not_contraction=False)
+
+        for other, extra in (("", []), ("Straße ", ["Straße"]), ("\u200b", []), ("\xa0", [])):
+            text = (plain + other) * 40
+            output = self.tokenizer.split(text)
+            self.assertListEqual(s(output), (values + extra) * 40 + [""])
+            self.assertEqual(text, Tokenizer.to_text(output))
+            self.assertTrue(all(text.startswith(t.value, t.offset) for t in output))
+
     def test_apostrophes(self):
         for a in Tokenizer._apostrophes:
             self.assertListEqual(s(self.tokenizer.split("ab" + a + "cd")), ["ab", a + "cd"])
@@ -108,6 +136,301 @@ class TestTokenizer(TestCase):
         self.assertListEqual([t.offset for t in result], [0, 2])
         self.assertListEqual([t.value for t in result], ["do", "not"])
 
+    def test_base_offset(self):
+        text = " Hello world. "
+        expected = self.tokenizer.split(text)
+        result = list(self.tokenizer.tokenize(text, 10))
+        self.assertListEqual(expected, result)
+        self.assertListEqual([t.offset + 10 for t in expected], [t.offset for t in result])
+        self.assertListEqual([t.spacing for t in expected], [t.spacing for t in result])
+
+    def test_tokenize_window(self):
+        text = "Skip this. Hello world.  And not this."
+        result = list(self.tokenizer.tokenize_window(text, 10, 25))
+        self.assertListEqual(s(result), ["Hello", "world", ".", ""])
+        self.assertListEqual([t.offset for t in result], [11, 17, 22, 25])
+        self.assertEqual(text[10:25], Tokenizer.to_text(result))
+
+    def test_bytes(self):
+        data = "Ünïcödé 😀 don't (Straße)".encode("utf-8")
+
+        for source in (data, bytearray(data), memoryview(data)):
+            result = self.tokenizer.split(source)
+            self.assertListEqual(s(result), ["Ünïcödé", "😀", "do", "not", "(", "Straße", ")"])
+            self.assertListEqual([t.offset for t in result], [0, 12, 17, 19, 23, 24, 31])
+
+        self.assertListEqual([t.offset for t in self.tokenizer.tokenize(b"a b", 10)], [10, 12])
+
+    def test_tokenize_file(self):
+        data = "Grüße, 😀 don't\n\n(see U.S.)  \n".encode("utf-8")
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "file.txt")
+
+            with open(path, "wb") as handle:
+                handle.write(data)
+
+            expected = [repr(t) for t in self.tokenizer.tokenize(data)]
+
+            for block_size in (1, 8, 1 << 20):
+                self.assertListEqual(expected, [repr(t) for t in self.tokenizer.tokenize_file(path, block_size)])
+
+            with open(path, "wb"):
+                pass  # empty file
+
+            self.assertListEqual([], list(self.tokenizer.tokenize_file(path)))
+
+
+class TestUtf8Offsets(TestCase):
+
+    def test_offsets(self):
+        offsets = Utf8Offsets("aä€😀b")
+        self.assertListEqual([offsets(i) for i in (0, 1, 2, 3, 4, 5, 2, 0)], [0, 1, 3, 6, 10, 11, 3, 0])
+        self.assertFalse(offsets.ascii)
+
+    def test_ascii(self):
+        offsets = Utf8Offsets("abc")
+        self.assertTrue(offsets.ascii)
+        self.assertEqual(2, offsets(2))
+
+    def test_base(self):
+        self.assertEqual(12, Utf8Offsets("abc", 10)(2))
+        self.assertEqual(13, Utf8Offsets("äbc", 10)(2))
+
+
+class TestChunkCache(TestCase):
+
+    def test_cached_tokens(self):
+        text = "Don't (see U.S. camelCase) e.g., 2018-11-11 and Straße-Bahn, don't! " * 3
+        tokenizer = Tokenizer(cache_size=100)
+        contractions = Tokenizer(replace_not_contraction=False, cache_size=100)
+
+        for _ in range(2):
+            result = tokenizer.split(text)
+            self.assertListEqual([repr(t) for t in Tokenizer().split(text)], [repr(t) for t in result])
+            self.assertEqual(text, Tokenizer.to_text(contractions.split(text)))
+
+        self.assertGreater(tokenizer.cache.hits, tokenizer.cache.misses)
+        self.assertEqual(0, tokenizer.cache.evictions)
+
+    def test_eviction(self):
+        cache = ChunkCache(2)
+        cache.put("a", ())
+        cache.put("b", ())
+        self.assertEqual((), cache.get("a"))
+        cache.put("c", ())
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((), cache.get("a"))
+        self.assertEqual(2, len(cache))
+        self.assertDictEqual(
+            {"size": 2, "maxsize": 2, "hits": 2, "misses": 1, "evictions": 1, "hit_rate": 2 / 3}, cache.as_dict()
+        )
+        cache.clear()
+        self.assertEqual(0, len(cache))
+        self.assertEqual(0.0, cache.hit_rate)
+
+    def test_bounded(self):
+        tokenizer = Tokenizer(cache_size=10)
+        tokenizer.split(" ".join("({})".format(i) for i in range(100)))
+        self.assertEqual(10, len(tokenizer.cache))
+        self.assertEqual(90, tokenizer.cache.evictions)
+
+    def test_no_cache(self):
+        self.assertIsNone(Tokenizer().cache)
+        self.assertRaises(ValueError, ChunkCache, 0)
+
+
+class TestToken(TestCase):
+
+    def test_token(self):
+        token = Token(" ", "value", 3)
+        self.assertEqual(" ", token.spacing)
+        self.assertEqual("value", token.value)
+        self.assertEqual(3, token.offset)
+        self.assertEqual(" value", str(token))
+
+    def test_tokenized_token(self):
+        token = Tokenizer().split("A  value.")[1]
+        self.assertEqual("  ", token.spacing)
+        self.assertEqual("value", token.value)
+        self.assertEqual(3, token.offset)
+        self.assertEqual(Token("", "value", 0), token)
+        self.assertEqual(hash(Token("", "value", 0)), hash(token))
+
+    def test_slots(self):
+        self.assertFalse(hasattr(Tokenizer().split("A value.")[1], "__dict__"))
+
+    def test_pickle(self):
+        token = Tokenizer().split("A value.")[1]
+        copy = pickle.loads(pickle.dumps(token))
+        self.assertEqual(repr(token), repr(copy))
+
+
+class TestTokenArray(TestCase):
+
+    def test_split_array(self):
+        text = " Don't split (this) ..."
+        tokenizer = Tokenizer()
+        expected = tokenizer.split(text)
+        result = tokenizer.split_array(text)
+        self.assertEqual(len(expected), len(result))
+        self.assertListEqual([repr(t) for t in expected], [repr(t) for t in result])
+        self.assertListEqual([t.value for t in expected], [result.value(i) for i in range(len(result))])
+        self.assertListEqual([t.spacing for t in expected], [result.spacing(i) for i in range(len(result))])
+        self.assertListEqual([t.offset for t in expected], list(result.starts))
+        self.assertEqual(repr(expected[2]), repr(result[2]))
+        self.assertEqual(TokenArray.NOT_CONTRACTION, result.flags[1])
+
+    def test_split_array_window(self):
+        text = "Skip this. Hello world.  And not this."
+        result = Tokenizer().split_array(text, 10, 25)
+        self.assertListEqual(["Hello", "world", ".", ""], [t.value for t in result])
+        self.assertListEqual([11, 17, 22, 25], list(result.starts))
+
+    def test_split_array_without_replacing_not(self):
+        result = Tokenizer(replace_not_contraction=False).split_array("don't")
+        self.assertListEqual(["do", "n't"], [t.value for t in result])
+        self.assertListEqual([0, 0], list(result.flags))
+
+
+class TestTokenBatch(TestCase):
+
+    TEXTS = ["Don't split (this) ...", "", "  ", "0", "#tag what now? ", "Straße!", "a\u200bb  cD\n"]
+
+    def test_tokenize_batch(self):
+        for tokenizer in (Tokenizer(), Tokenizer(cache_size=2)):
+            result = tokenizer.tokenize_batch(iter(self.TEXTS))
+            self.assertEqual(len(self.TEXTS) + 1, len(result.boundaries))
+            self.assertEqual(len(result), result.boundaries[-1])
+
+            for index, text in enumerate(self.TEXTS):
+                expected = tokenizer.split(text)
+                self.assertEqual(text, result.text[result.offsets[index]:result.offsets[index] + len(text)])
+                self.assertEqual(len(expected), result.size(index))
+                self.assertListEqual([repr(t) for t in expected], [repr(t) for t in result.tokens(index)])
+                self.assertListEqual(s(expected), result.values(index))
+
+    def test_empty(self):
+        result = Tokenizer().tokenize_batch([])
+        self.assertEqual(0, len(result))
+        self.assertListEqual([0], list(result.boundaries))
+        self.assertListEqual([], Tokenizer().tokenize_batch([""]).tokens(0))
+
+    def test_long_texts(self):
+        texts = ["Hello World! " * 50, "Hallo Wält! " * 50, "x " * 300]
+        result = Tokenizer().tokenize_batch(texts)
+        self.assertListEqual([[repr(t) for t in Tokenizer().split(text)] for text in texts],
+                             [[repr(t) for t in result.tokens(i)] for i in range(len(texts))])
+        self.assertIsInstance(result, TokenBatch)
+
+
+class TestLazyPattern(TestCase):
+
+    def test_compiled_on_first_use(self):
+        class Patterns:
+            digits = module._LazyPattern(r"\d+")
+            end = module._LazyPattern(r"\d+", reverse=True)
+
+        self.assertIsInstance(Patterns.__dict__["digits"], module._LazyPattern)
+        self.assertEqual("12", Patterns.digits.search("a12b").group())
+        self.assertNotIsInstance(Patterns.__dict__["digits"], module._LazyPattern)
+        self.assertIsInstance(Patterns.__dict__["end"], module._LazyPattern)
+        module.compile_patterns()
+        self.assertEqual(2, Patterns.__dict__["end"].search("1a23").start())
+
+    def test_import(self):
+        code = "import sys, syntok.segmenter; print(sorted(set(sys.modules) & {'regex', 'asyncio', 'multiprocessing'}))"
+        output = subprocess.run(
+            [sys.executable, "-c", code], stdout=subprocess.PIPE, check=True, universal_newlines=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        ).stdout
+        self.assertEqual("[]", output.strip())
+
+
+class TestBackends(TestCase):
+
+    def test_re_backend(self):
+        class Patterns:
+            spaces = module._LazyPattern(r"\s+", backend="re")
+
+        self.assertIsInstance(Patterns.spaces, type(re.compile("")))
+        self.assertRaises(AssertionError, module._LazyPattern, r"\s", reverse=True, backend="re")
+
+    def test_spacing(self):
+        import regex
+
+        text = "".join(chr(c) for c in range(0x110000) if not 0xD800 <= c < 0xE000)
+        self.assertEqual(regex.findall(r"[\s\u200b]", text), Tokenizer._spacing.findall(text))
+
+    def test_ascii_patterns(self):
+        with open(os.path.dirname(__file__) + '/tokenizer_test.txt', 'rt', encoding='utf-8') as examples:
+            lines = [line for line in examples if Tokenizer._is_plain(line, 0, len(line))]
+
+        self.assertTrue(lines)
+
+        for line in lines:
+            self.assertEqual(
+                [m.span() for m in Tokenizer._chunks.finditer(line)],
+                [m.span() for m in Tokenizer._ascii_chunks.finditer(line)], line
+            )
+            self.assertEqual(
+                [m.span() for m in Tokenizer._separation.finditer(line)],
+                [m.span() for m in Tokenizer._ascii_separation.finditer(line)], line
+            )
+
+    def test_same_tokens(self):
+        with open(os.path.dirname(__file__) + '/tokenizer_test.txt', 'rt', encoding='utf-8') as examples:
+            text = examples.read()
+
+        expected = list(Tokenizer().tokenize(text))
+
+        with mock.patch.object(Tokenizer, "_ascii_chunks", Tokenizer._chunks), \
+                mock.patch.object(Tokenizer, "_ascii_separation", Tokenizer._separation):
+            self.assertEqual(expected, list(Tokenizer().tokenize(text)))
+
+    def test_ascii_without_regex(self):
+        code = "import sys; from syntok.tokenizer import Tokenizer; " \
+               "list(Tokenizer().tokenize(\"Don't (U.S.) x-ray...\")); print('regex' in sys.modules)"
+        output = subprocess.run(
+            [sys.executable, "-c", code], stdout=subprocess.PIPE, check=True, universal_newlines=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        ).stdout
+        self.assertEqual("False", output.strip())
+
+
+class TestCommandLine(TestCase):
+
+    LINES = ["Don't split\tthis.  \r\n", "\n", "Zwei Straße\n"]
+
+    def test_text(self):
+        expected = "".join(" ".join(s(Tokenizer().tokenize(line))) + "\n" for line in self.LINES)
+        self.assertEqual(expected, module._format_lines(self.LINES, "text"))
+
+    def test_jsonl(self):
+        rows = [json.loads(line) for line in module._format_lines(self.LINES, "jsonl").splitlines()]
+        self.assertEqual(3, len(rows))
+        self.assertEqual({"value": "split", "offset": 6, "spacing": " "}, rows[0][2])
+        self.assertEqual({"value": "", "offset": 19, "spacing": "  "}, rows[0][-1])
+        self.assertListEqual([], rows[1])
+        self.assertEqual({"value": "Straße", "offset": 5, "spacing": " "}, rows[2][1])
+
+    def test_tsv(self):
+        rows = module._format_lines(self.LINES, "tsv", 10).splitlines()
+        self.assertEqual("10\t0\t2\tDo", rows[0])
+        self.assertEqual("12\t5\t11\tStraße", rows[-1])
+        self.assertEqual(8, len(rows))
+
+    def test_line_chunks(self):
+        chunks = list(module._line_chunks([["a", "b", "c"], [], ["d"]], 2))
+        self.assertListEqual([(["a", "b"], 1), (["c"], 3), (["d"], 4)], chunks)
+
+    def test_imap(self):
+        chunks = [(self.LINES[:1], 1), (self.LINES[1:], 2)] * 3
+
+        for workers in (1, 2):
+            outputs = list(module._imap(partial(module._format_chunk, "tsv"), chunks, workers))
+            self.assertListEqual([module._format_lines(c[0], "tsv", c[1]) for c in chunks], outputs)
+
 
 class TestToText(TestCase):
 